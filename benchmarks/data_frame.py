@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare ways of converting a pandas data frame to records.
+
+Each conversion runs in its own process so its peak memory is measured
+in isolation.
+
+Examples
+--------
+    python -m benchmarks.data_frame --rows 1000000
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+import tabulate
+
+from file_validator import main as validator
+from . import harness
+
+
+def make_data_frame(rows, seed=0):
+
+    """
+    Returns pandas.DataFrame.
+
+    A frame with integer, float, boolean and string columns.
+
+    Parameters
+    ----------
+    rows : Integer
+    seed : Integer, default 0
+    """
+
+    random_state = np.random.RandomState(seed)
+    floats = random_state.standard_normal(rows)
+    floats[::7] = np.nan
+
+    return pd.DataFrame(
+        {'id': np.arange(rows),
+         'amount': floats,
+         'is_active': random_state.rand(rows) > 0.5,
+         'name': ['name-{0}'.format(i % 1000) for i in xrange(rows)]},
+        columns=['id', 'amount', 'is_active', 'name'])
+
+
+def convert_csv_round_trip(data_frame):
+    buffer = data_frame.to_csv(index=False)
+    return len(validator.DataTable.from_delimited_buffer(buffer=buffer,
+                                                         delimiter=','))
+
+
+def convert_direct(data_frame):
+    return len(validator.DataTable.from_data_frame(data_frame))
+
+
+def convert_streaming(data_frame):
+    statistics = validator.measure_skewness(
+        records=validator.iter_data_frame_records(data_frame=data_frame))
+    return statistics.record_count
+
+
+CONVERSIONS = [('csv round trip', convert_csv_round_trip),
+               ('direct', convert_direct),
+               ('streaming', convert_streaming)]
+
+
+def run(rows):
+
+    """
+    Returns List.
+
+    The name, record count, seconds and peak memory growth in MiB of
+    each conversion.
+
+    Parameters
+    ----------
+    rows : Integer
+    """
+
+    results = list()
+    for name, conversion in CONVERSIONS:
+        measurement = harness.measure(conversion,
+                                      args=(rows,),
+                                      setup=make_data_frame)
+        results.append((name,
+                        measurement['result'],
+                        measurement['seconds'],
+                        measurement['peak_mib']))
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.data_frame')
+    parser.add_argument('--rows', type=int, default=200000)
+    arguments = parser.parse_args(argv)
+
+    print tabulate.tabulate(run(rows=arguments.rows),
+                            headers=['conversion',
+                                     'records',
+                                     'seconds',
+                                     'peak MiB'],
+                            floatfmt='.2f')
+
+
+if __name__ == '__main__':
+    main()
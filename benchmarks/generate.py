@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+
+"""
+Generate synthetic delimited and XLSX files.
+
+The files are generated from a seed, so the same parameters always give
+the same bytes and results stay comparable across commits.
+"""
+
+import csv
+import itertools
+import random
+import tempfile
+import zipfile
+from xml.sax.saxutils import escape
+
+
+def iter_records(rows,
+                 columns,
+                 skew_rate=0.0,
+                 quote_rate=0.0,
+                 delimiter=',',
+                 seed=0):
+
+    """
+    Returns Generator.
+
+    The header and then the body records.
+
+    Parameters
+    ----------
+    rows : Integer
+        Number of body records.
+    columns : Integer
+        Number of fields in the header.
+    skew_rate : Float, default 0.0
+        Fraction of body records with one to three extra fields.
+    quote_rate : Float, default 0.0
+        Fraction of values holding the delimiter, a quote and a
+        newline, which must be quoted.
+    delimiter : String, default ","
+    seed : Integer, default 0
+    """
+
+    random_ = random.Random(seed)
+    yield ['column_{0}'.format(index) for index in xrange(columns)]
+
+    quoted_value = 'a{0}"b"\nc'.format(delimiter)
+    for row in xrange(rows):
+        width = columns
+        if skew_rate and random_.random() < skew_rate:
+            width += random_.randint(1, 3)
+
+        record = list()
+        for column in xrange(width):
+            if quote_rate and random_.random() < quote_rate:
+                record.append(quoted_value)
+            elif column % 2:
+                record.append(str(random_.randint(0, 10 ** 6)))
+            else:
+                record.append('value-{0}'.format(random_.randint(0, 999)))
+        yield record
+
+
+def write_delimited(file_path,
+                    rows,
+                    columns,
+                    delimiter=',',
+                    skew_rate=0.0,
+                    quote_rate=0.0,
+                    has_header=True,
+                    seed=0):
+
+    """
+    Returns String or None.
+
+    Write a delimited file. If it has no header, the header is written
+    to a separate file whose path is returned.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    rows : Integer
+    columns : Integer
+    delimiter : String, default ","
+    skew_rate : Float, default 0.0
+    quote_rate : Float, default 0.0
+    has_header : Boolean, default True
+    seed : Integer, default 0
+    """
+
+    records = iter_records(rows=rows,
+                           columns=columns,
+                           skew_rate=skew_rate,
+                           quote_rate=quote_rate,
+                           delimiter=delimiter,
+                           seed=seed)
+    header = next(records)
+
+    header_file_path = None
+    if not has_header:
+        header_file_path = _header_file_path(file_path)
+        with open(header_file_path, 'wb') as file:
+            csv.writer(file, delimiter=delimiter).writerow(header)
+
+    with open(file_path, 'wb') as file:
+        writer = csv.writer(file, delimiter=delimiter)
+        if has_header:
+            writer.writerow(header)
+        writer.writerows(records)
+
+    return header_file_path
+
+
+def write_xlsx(file_path,
+               rows,
+               columns,
+               skew_rate=0.0,
+               quote_rate=0.0,
+               has_header=True,
+               seed=0):
+
+    """
+    Returns String or None.
+
+    Write a single sheet XLSX workbook. Numbers are stored as numbers
+    and text in the shared strings table, as Excel does. If the sheet
+    has no header, the header is written to a separate CSV file whose
+    path is returned.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    rows : Integer
+    columns : Integer
+    skew_rate : Float, default 0.0
+    quote_rate : Float, default 0.0
+    has_header : Boolean, default True
+    seed : Integer, default 0
+    """
+
+    records = iter_records(rows=rows,
+                           columns=columns,
+                           skew_rate=skew_rate,
+                           quote_rate=quote_rate,
+                           seed=seed)
+    header = next(records)
+
+    header_file_path = None
+    if not has_header:
+        header_file_path = _header_file_path(file_path, extension='.csv')
+        with open(header_file_path, 'wb') as file:
+            csv.writer(file).writerow(header)
+    else:
+        records = itertools.chain([header], records)
+
+    # The sheet is streamed to a temporary file as it may be large.
+    shared_strings = dict()
+    sheet = tempfile.NamedTemporaryFile()
+    sheet.write('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="{namespace}"><sheetData>'
+                .format(namespace=_SPREADSHEET_NAMESPACE))
+    for row_index, record in enumerate(records, 1):
+        cells = list()
+        for column_index, value in enumerate(record):
+            reference = _cell_reference(row_index, column_index)
+            if value.isdigit():
+                cells.append('<c r="{0}"><v>{1}</v></c>'.format(reference,
+                                                                value))
+            else:
+                index = shared_strings.setdefault(value, len(shared_strings))
+                cells.append('<c r="{0}" t="s"><v>{1}</v></c>'.format(
+                    reference,
+                    index))
+        sheet.write('<row r="{0}">{1}</row>'.format(row_index,
+                                                    ''.join(cells)))
+    sheet.write('</sheetData></worksheet>')
+    sheet.flush()
+
+    strings = sorted(shared_strings, key=shared_strings.get)
+    shared_strings_xml = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<sst xmlns="{namespace}" count="{count}" uniqueCount="{count}">'
+        '{items}</sst>').format(
+            namespace=_SPREADSHEET_NAMESPACE,
+            count=len(strings),
+            items=''.join('<si><t xml:space="preserve">{0}</t></si>'
+                          .format(escape(string))
+                          for string in strings))
+
+    with sheet, zipfile.ZipFile(file_path, 'w',
+                                zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        archive.writestr('_rels/.rels', _PACKAGE_RELATIONSHIPS)
+        archive.writestr('xl/workbook.xml', _WORKBOOK)
+        archive.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELATIONSHIPS)
+        archive.writestr('xl/sharedStrings.xml', shared_strings_xml)
+        archive.write(sheet.name, 'xl/worksheets/sheet1.xml')
+
+    return header_file_path
+
+
+def _header_file_path(file_path, extension=None):
+    index = file_path.rfind('.')
+    return file_path[:index] + '-header' + (extension or file_path[index:])
+
+
+def _cell_reference(row_index, column_index):
+    letters = ''
+    column_index += 1
+    while column_index:
+        column_index, remainder = divmod(column_index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+
+    return letters + str(row_index)
+
+
+_SPREADSHEET_NAMESPACE = (
+    'http://schemas.openxmlformats.org/spreadsheetml/2006/main')
+_RELATIONSHIPS_NAMESPACE = (
+    'http://schemas.openxmlformats.org/officeDocument/2006/relationships')
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'content-types">'
+    '<Default Extension="rels" ContentType="application/'
+    'vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="'
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.'
+    'worksheet+xml"/>'
+    '<Override PartName="/xl/sharedStrings.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+    '</Types>')
+
+_PACKAGE_RELATIONSHIPS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'relationships">'
+    '<Relationship Id="rId1" Type="{namespace}/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>').format(namespace=_RELATIONSHIPS_NAMESPACE)
+
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="{namespace}" xmlns:r="{relationships}">'
+    '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>').format(namespace=_SPREADSHEET_NAMESPACE,
+                          relationships=_RELATIONSHIPS_NAMESPACE)
+
+_WORKBOOK_RELATIONSHIPS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'relationships">'
+    '<Relationship Id="rId1" Type="{namespace}/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="{namespace}/sharedStrings" '
+    'Target="sharedStrings.xml"/>'
+    '</Relationships>').format(namespace=_RELATIONSHIPS_NAMESPACE)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""
+Time a function and measure its peak memory in a fresh process.
+"""
+
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import time
+import traceback
+
+
+def measure(function, args=(), setup=None):
+
+    """
+    Returns Dictionary.
+
+    The seconds taken by function(*args), the growth in peak resident
+    memory in MiB while it ran, and its result. The call runs in a
+    child process so earlier calls do not hide its peak memory.
+
+    Parameters
+    ----------
+    function : Callable
+        Module level function, so that it can be run in a child
+        process.
+    args : Tuple, default ()
+    setup : Callable, default None
+        If given, setup(*args) is called first, untimed, and the
+        function is called with its result instead.
+    """
+
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_run,
+                                      args=(queue, function, args, setup))
+    process.start()
+    measurement = queue.get()
+    process.join()
+
+    if 'error' in measurement:
+        raise RuntimeError(measurement['error'])
+
+    return measurement
+
+
+def peak_memory():
+
+    """
+    Returns Float.
+
+    The peak resident memory of this process in MiB.
+    """
+
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    scale = 1024.0 * 1024.0 if sys.platform == 'darwin' else 1024.0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def environment():
+
+    """
+    Returns Dictionary.
+
+    The git revision and Python version the benchmarks ran with.
+    """
+
+    directory = os.path.dirname(os.path.abspath(__file__))
+    try:
+        with open(os.devnull, 'wb') as devnull:
+            revision = subprocess.check_output(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=directory,
+                stderr=devnull).strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+
+    return {
+        'revision': revision,
+        'python': sys.version.split()[0]
+    }
+
+
+def _run(queue, function, args, setup):
+    try:
+        if setup is not None:
+            args = (setup(*args),)
+        baseline = peak_memory()
+        start = time.time()
+        result = function(*args)
+        seconds = time.time() - start
+        queue.put({
+            'seconds': seconds,
+            'peak_mib': peak_memory() - baseline,
+            'result': result
+        })
+    except Exception:
+        queue.put({'error': traceback.format_exc()})
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+"""
+Time importing the validator in a fresh interpreter.
+
+When one process is launched per file, the import is a large share of
+the runtime. Python 2 has no "-X importtime", so the child interpreter
+wraps __import__ instead and reports the time spent in each top-level
+package, excluding the packages it imported in turn.
+
+Examples
+--------
+    python -m benchmarks.startup
+    python -m benchmarks.startup --module file_validator.main --repeat 10
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import tabulate
+
+# Slow to import and needed only by some code paths, so they must not
+# be imported by the modules themselves.
+DEFERRED_MODULES = ('pandas', 'xlrd', 'tabulate', 'nose')
+
+_CHILD = r'''
+import __builtin__
+import json
+import sys
+import time
+
+original_import = __builtin__.__import__
+self_seconds = dict()
+stack = list()
+
+def timed_import(name, globals=None, locals=None, fromlist=None, level=-1):
+    if name and level <= 0:
+        package = name.split('.')[0]
+    else:
+        package = (globals or dict()).get('__name__', '').split('.')[0]
+    stack.append(0.0)
+    start = time.time()
+    try:
+        return original_import(name, globals, locals, fromlist, level)
+    finally:
+        seconds = time.time() - start
+        children_seconds = stack.pop()
+        self_seconds[package] = (self_seconds.get(package, 0.0)
+                                 + seconds - children_seconds)
+        if stack:
+            stack[-1] += seconds
+
+__builtin__.__import__ = timed_import
+start = time.time()
+__import__(sys.argv[1])
+seconds = time.time() - start
+__builtin__.__import__ = original_import
+
+json.dump({
+    'seconds': seconds,
+    'self_seconds': self_seconds,
+    'modules': sorted(set(name.split('.')[0] for name in sys.modules))
+}, sys.stdout)
+'''
+
+
+def measure(module='file_validator.cli', repeat=5):
+
+    """
+    Returns Dictionary.
+
+    The fastest of the repeated imports of the module, each in a fresh
+    interpreter. It holds the seconds taken, the self time of each
+    top-level package imported, and which of DEFERRED_MODULES were
+    imported.
+
+    Parameters
+    ----------
+    module : String, default "file_validator.cli"
+    repeat : Integer, default 5
+    """
+
+    directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    measurements = list()
+    for _ in xrange(repeat):
+        output = subprocess.check_output(
+            [sys.executable, '-c', _CHILD, module],
+            cwd=directory)
+        measurements.append(json.loads(output))
+
+    measurement = min(measurements, key=lambda measurement:
+                      measurement['seconds'])
+    measurement['module'] = module
+    measurement['deferred_modules'] = [name
+                                       for name in DEFERRED_MODULES
+                                       if name in measurement['modules']]
+
+    return measurement
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.startup',
+        description='Time importing the validator in a fresh interpreter.')
+    parser.add_argument('--module', default='file_validator.cli')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top',
+                        type=int,
+                        default=10,
+                        help='number of packages listed (default: 10)')
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None, stdout=None):
+
+    """
+    Returns Integer.
+
+    Print the import time of the module and its slowest packages. The
+    exit status is 1 if any of DEFERRED_MODULES was imported.
+    """
+
+    stdout = stdout or sys.stdout
+    arguments = parse_arguments(argv)
+    measurement = measure(module=arguments.module, repeat=arguments.repeat)
+
+    packages = sorted(measurement['self_seconds'].items(),
+                      key=lambda item: item[1],
+                      reverse=True)[:arguments.top]
+    stdout.write('{module}: {seconds:.3f} s\n'.format(**measurement))
+    stdout.write(tabulate.tabulate(packages,
+                                   headers=['package', 'self s'],
+                                   floatfmt='.3f') + '\n')
+    if measurement['deferred_modules']:
+        stdout.write('imported at startup: {0}\n'.format(
+            ', '.join(measurement['deferred_modules'])))
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
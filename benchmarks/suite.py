@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+
+"""
+Time each stage of the validation pipeline over synthetic files.
+
+Each stage runs in its own process so its peak memory is measured in
+isolation. The import of the command line interface is timed too, as
+the "import_cli" stage of the "startup" case. The results can be saved
+as JSON and compared with a run from another commit.
+
+Examples
+--------
+    python -m benchmarks --rows 1000000 --output before.json
+    python -m benchmarks --rows 1000000 --compare before.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import tabulate
+
+from file_validator import main as validator
+from . import generate, harness, startup
+
+
+def make_cases(directory,
+               rows,
+               columns,
+               skew_rate,
+               quote_rate,
+               xlsx_rows,
+               seed=0):
+
+    """
+    Returns List.
+
+    Generate one file per case into the directory. Each case is a
+    dictionary describing how to validate its file.
+
+    Parameters
+    ----------
+    directory : String
+    rows : Integer
+    columns : Integer
+    skew_rate : Float
+    quote_rate : Float
+    xlsx_rows : Integer
+    seed : Integer, default 0
+    """
+
+    cases = list()
+
+    for name, case_quote_rate, has_header in [('delimited', 0.0, True),
+                                              ('quoted', quote_rate, True),
+                                              ('missing_header', 0.0, False)]:
+        file_path = os.path.join(directory, name + '.csv')
+        header_file_path = generate.write_delimited(file_path=file_path,
+                                                    rows=rows,
+                                                    columns=columns,
+                                                    skew_rate=skew_rate,
+                                                    quote_rate=case_quote_rate,
+                                                    has_header=has_header,
+                                                    seed=seed)
+        cases.append({
+            'name': name,
+            'file_path': file_path,
+            'delimiter': ',',
+            'is_excel': False,
+            'header_file_path': header_file_path
+        })
+
+    file_path = os.path.join(directory, 'workbook.xlsx')
+    generate.write_xlsx(file_path=file_path,
+                        rows=xlsx_rows,
+                        columns=columns,
+                        skew_rate=skew_rate,
+                        quote_rate=quote_rate,
+                        seed=seed)
+    cases.append({
+        'name': 'xlsx',
+        'file_path': file_path,
+        'delimiter': ',',
+        'is_excel': True,
+        'header_file_path': None
+    })
+
+    return cases
+
+
+def sniff_dialect(case):
+    with validator.DataSource(file_path=case['file_path']) as source:
+        return validator.sniff_dialect(source.sample()).delimiter
+
+
+def is_not_skewed(case):
+    return validator.is_not_skewed(file_path=case['file_path'],
+                                   delimiter=case['delimiter'],
+                                   header_file_path=case['header_file_path'])
+
+
+def measure_skewness(case):
+    header_width = None
+    if case['header_file_path']:
+        header_width = len(validator.handle_header(
+            header_file_path=case['header_file_path'],
+            delimiter=case['delimiter']))
+    statistics = validator.measure_skewness(
+        records=validator.read_records(file_path=case['file_path'],
+                                       delimiter=case['delimiter']),
+        header_width=header_width)
+    return statistics.is_skewed
+
+
+def validate(case):
+    return _validate(case).is_skewed
+
+
+def validate_lazy(case):
+    return _validate(case, lazy=True).is_skewed
+
+
+def validate_profile(case):
+    return _validate(case, profile=True).is_skewed
+
+
+def data_table_from_delimited(case):
+    return len(validator.DataTable.from_delimited(
+        file_path=case['file_path'],
+        delimiter=case['delimiter']))
+
+
+def read_excel(case):
+    return len(validator._primitive_read_excel(case['file_path']))
+
+
+def convert_excel_to_csv(case):
+    return os.path.getsize(validator.convert_excel_to_csv(case['file_path']))
+
+
+def _validate(case, **options):
+    return validator.validate(file_path=case['file_path'],
+                              delimiter=case['delimiter'],
+                              is_excel=case['is_excel'],
+                              has_header=case['header_file_path'] is None,
+                              header_file_path=case['header_file_path'],
+                              **options)
+
+
+DELIMITED_STAGES = [sniff_dialect,
+                    is_not_skewed,
+                    measure_skewness,
+                    validate,
+                    validate_lazy,
+                    validate_profile,
+                    data_table_from_delimited]
+
+EXCEL_STAGES = [read_excel,
+                convert_excel_to_csv,
+                validate,
+                validate_profile]
+
+
+def run(cases, repeat=1, stages=None):
+
+    """
+    Returns List.
+
+    One result per case and stage, with the fastest of the repeated
+    runs and the largest peak memory growth.
+
+    Parameters
+    ----------
+    cases : List
+    repeat : Integer, default 1
+    stages : List, default None
+        Names of the stages to run. If None, all are run.
+    """
+
+    results = list()
+    for case in cases:
+        for stage in EXCEL_STAGES if case['is_excel'] else DELIMITED_STAGES:
+            if stages and stage.__name__ not in stages:
+                continue
+            measurements = [harness.measure(stage, args=(case,))
+                            for _ in xrange(repeat)]
+            results.append({
+                'case': case['name'],
+                'stage': stage.__name__,
+                'seconds': min(measurement['seconds']
+                               for measurement in measurements),
+                'peak_mib': max(measurement['peak_mib']
+                                for measurement in measurements)
+            })
+
+    return results
+
+
+def compare(results, baseline):
+
+    """
+    Returns List.
+
+    Rows comparing each result with the baseline result for the same
+    case and stage. The change is the relative change in seconds.
+
+    Parameters
+    ----------
+    results : List
+    baseline : List
+    """
+
+    baseline = dict(((result['case'], result['stage']), result)
+                    for result in baseline)
+    rows = list()
+    for result in results:
+        before = baseline.get((result['case'], result['stage']))
+        if before is None:
+            rows.append((result['case'], result['stage'], None,
+                         result['seconds'], None, None, result['peak_mib']))
+            continue
+        change = ((result['seconds'] - before['seconds']) / before['seconds']
+                  if before['seconds']
+                  else None)
+        rows.append((result['case'],
+                     result['stage'],
+                     before['seconds'],
+                     result['seconds'],
+                     '{0:+.0%}'.format(change) if change is not None else None,
+                     before['peak_mib'],
+                     result['peak_mib']))
+
+    return rows
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Time each validation stage over synthetic files.')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--columns', type=int, default=10)
+    parser.add_argument('--skew-rate', type=float, default=0.001)
+    parser.add_argument('--quote-rate', type=float, default=0.01)
+    parser.add_argument(
+        '--xlsx-rows',
+        type=int,
+        help='rows of the XLSX case (default: a tenth of --rows)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--stage',
+                        action='append',
+                        dest='stages',
+                        help='run only this stage; may be repeated')
+    parser.add_argument('--output',
+                        metavar='PATH',
+                        help='save the results as JSON')
+    parser.add_argument('--compare',
+                        metavar='PATH',
+                        help='compare with results saved by --output')
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None, stdout=None):
+    stdout = stdout or sys.stdout
+    arguments = parse_arguments(argv)
+    parameters = {
+        'rows': arguments.rows,
+        'columns': arguments.columns,
+        'skew_rate': arguments.skew_rate,
+        'quote_rate': arguments.quote_rate,
+        'xlsx_rows': (arguments.xlsx_rows
+                      if arguments.xlsx_rows is not None
+                      else arguments.rows // 10),
+        'seed': arguments.seed
+    }
+
+    directory = tempfile.mkdtemp()
+    try:
+        cases = make_cases(directory=directory, **parameters)
+        results = run(cases=cases,
+                      repeat=arguments.repeat,
+                      stages=arguments.stages)
+    finally:
+        shutil.rmtree(directory)
+    if not arguments.stages or 'import_cli' in arguments.stages:
+        measurement = startup.measure(module='file_validator.cli',
+                                      repeat=arguments.repeat)
+        results.append({
+            'case': 'startup',
+            'stage': 'import_cli',
+            'seconds': measurement['seconds'],
+            'peak_mib': None
+        })
+
+    report = {
+        'environment': harness.environment(),
+        'parameters': parameters,
+        'results': results
+    }
+
+    if arguments.output:
+        with open(arguments.output, 'wb') as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+
+    if arguments.compare:
+        with open(arguments.compare, 'rb') as file:
+            baseline_report = json.load(file)
+        if baseline_report['parameters'] != parameters:
+            stdout.write('warning: the baseline ran with different '
+                         'parameters: {0}\n'.format(
+                             json.dumps(baseline_report['parameters'],
+                                        sort_keys=True)))
+        stdout.write(tabulate.tabulate(
+            compare(results=results, baseline=baseline_report['results']),
+            headers=['case',
+                     'stage',
+                     'before s',
+                     'after s',
+                     'change',
+                     'before MiB',
+                     'after MiB'],
+            floatfmt='.3f') + '\n')
+    else:
+        stdout.write(tabulate.tabulate(
+            [(result['case'],
+              result['stage'],
+              result['seconds'],
+              result['peak_mib']) for result in results],
+            headers=['case', 'stage', 'seconds', 'peak MiB'],
+            floatfmt='.3f') + '\n')
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+import StringIO
+import json
+import os
+import shutil
+import tempfile
+
+from nose.tools import assert_equal, assert_true
+
+from file_validator import main as validator
+from .. import generate, startup, suite
+
+
+class TestGenerate(object):
+
+    def setup(self):
+        self.directory = tempfile.mkdtemp()
+
+    def teardown(self):
+        shutil.rmtree(self.directory)
+
+    def test_write_delimited(self):
+
+        file_path = os.path.join(self.directory, 'foo.txt')
+        header_file_path = generate.write_delimited(file_path=file_path,
+                                                    rows=200,
+                                                    columns=4,
+                                                    delimiter='|',
+                                                    skew_rate=0.1,
+                                                    quote_rate=0.1,
+                                                    has_header=False)
+
+        validation_results = validator.validate(
+            file_path=file_path,
+            delimiter='|',
+            has_header=False,
+            header_file_path=header_file_path)
+        assert_true(validation_results.is_skewed)
+        assert_equal(validation_results.header_width, 4)
+        assert_equal(len(validation_results.source_data_table), 200)
+
+        # The same seed gives the same bytes.
+        with open(file_path, 'rb') as file:
+            buffer = file.read()
+        generate.write_delimited(file_path=file_path,
+                                 rows=200,
+                                 columns=4,
+                                 delimiter='|',
+                                 skew_rate=0.1,
+                                 quote_rate=0.1,
+                                 has_header=False)
+        with open(file_path, 'rb') as file:
+            assert_equal(file.read(), buffer)
+
+    def test_write_xlsx(self):
+
+        file_path = os.path.join(self.directory, 'foo.xlsx')
+        generate.write_xlsx(file_path=file_path,
+                            rows=50,
+                            columns=30,
+                            quote_rate=0.1)
+
+        expected_records = [
+            [value if not value.isdigit() else unicode(float(value))
+             for value in record]
+            for record in generate.iter_records(rows=50,
+                                                columns=30,
+                                                quote_rate=0.1)]
+        assert_equal(validator._primitive_read_excel(file_path),
+                     expected_records)
+
+
+def test_suite():
+
+    stdout = StringIO.StringIO()
+    directory = tempfile.mkdtemp()
+    output_path = os.path.join(directory, 'results.json')
+    try:
+        suite.main(argv=['--rows', '20',
+                         '--repeat', '1',
+                         '--stage', 'validate',
+                         '--output', output_path],
+                   stdout=stdout)
+        with open(output_path, 'rb') as file:
+            report = json.load(file)
+    finally:
+        shutil.rmtree(directory)
+
+    assert_equal(sorted(result['case'] for result in report['results']),
+                 ['delimited', 'missing_header', 'quoted', 'xlsx'])
+    assert_equal(report['parameters']['xlsx_rows'], 2)
+    assert_true('validate' in stdout.getvalue())
+
+
+def test_startup():
+
+    stdout = StringIO.StringIO()
+    status = startup.main(argv=['--repeat', '1'], stdout=stdout)
+
+    # Plain delimited files must not pay for pandas, xlrd, tabulate or
+    # nose at startup.
+    assert_equal(status, 0, msg=stdout.getvalue())
+    assert_true('file_validator' in stdout.getvalue())
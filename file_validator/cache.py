@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from . import main
+
+
+def default_directory():
+
+    """
+    Returns String.
+
+    The directory named by FILE_VALIDATOR_CACHE_DIRECTORY, or
+    ~/.cache/file_validator.
+    """
+
+    return os.environ.get(
+        'FILE_VALIDATOR_CACHE_DIRECTORY',
+        os.path.join(os.path.expanduser('~'), '.cache', 'file_validator'))
+
+
+class ValidationCache(object):
+
+    """
+    Persistent cache of validation summaries, stored in SQLite.
+
+    Entries are keyed on the file path and the validation options, and
+    are only returned while the file's size and modification time, and
+    optionally its content hash, are unchanged. If the options name a
+    header file, its size, modification time and inode are part of the
+    key, so editing or replacing it misses the cache. Least recently used
+    entries are evicted beyond max_entries, and entries older than ttl
+    seconds are never returned.
+
+    Each hit commits its access time straight away, so no process holds
+    the write lock between lookups. With the write-ahead log and
+    synchronous=NORMAL the commit does not wait on the disk.
+
+    Parameters
+    ----------
+    directory : String, default None
+        If None, default_directory() is used.
+    max_entries : Integer, default 100000
+    ttl : Float, default None
+        Maximum age of an entry in seconds. If None, entries do not
+        expire.
+    use_content_hash : Boolean, default False
+        If True, an MD5 hash of the contents must also match. This
+        reads the whole file on every lookup.
+    """
+
+    file_name = 'cache.sqlite3'
+
+    def __init__(self,
+                 directory=None,
+                 max_entries=100000,
+                 ttl=None,
+                 use_content_hash=False):
+        self.directory = directory or default_directory()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.use_content_hash = use_content_hash
+
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        self._connection = sqlite3.connect(
+            os.path.join(self.directory, self.file_name),
+            timeout=30)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                file_path TEXT NOT NULL,
+                options TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                content_hash TEXT,
+                summary TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                PRIMARY KEY (file_path, options))""")
+        self._connection.execute("""
+            CREATE INDEX IF NOT EXISTS results_accessed
+            ON results (accessed)""")
+        self._connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._connection.commit()
+        self._connection.close()
+
+    def get(self, file_path, options=None):
+
+        """
+        Returns Dictionary or None.
+
+        The cached summary, or None if there is no valid entry.
+
+        Parameters
+        ----------
+        file_path : String
+            File name or path.
+        options : Dictionary, default None
+            Validation options the summary was produced with.
+        """
+
+        key = (os.path.abspath(file_path), _serialize(options))
+        row = self._connection.execute("""
+            SELECT size, mtime, content_hash, summary, created
+            FROM results
+            WHERE file_path = ? AND options = ?""", key).fetchone()
+        if row is None:
+            return None
+
+        size, mtime, content_hash, summary, created = row
+        now = time.time()
+        status = os.stat(file_path)
+        if (status.st_size != size
+                or status.st_mtime != mtime
+                or (self.ttl is not None and now - created > self.ttl)
+                or (self.use_content_hash
+                    and hash_contents(file_path) != content_hash)):
+            return None
+
+        self._connection.execute("""
+            UPDATE results
+            SET accessed = ?
+            WHERE file_path = ? AND options = ?""", (now,) + key)
+        self._connection.commit()
+
+        return json.loads(summary)
+
+    def put(self, file_path, summary, options=None):
+
+        """
+        Returns None.
+
+        Parameters
+        ----------
+        file_path : String
+            File name or path.
+        summary : Dictionary
+            JSON serializable summary, such as
+            ValidationResults.to_dict().
+        options : Dictionary, default None
+            Validation options the summary was produced with.
+        """
+
+        status = os.stat(file_path)
+        now = time.time()
+        content_hash = (hash_contents(file_path)
+                        if self.use_content_hash
+                        else None)
+
+        self._connection.execute("""
+            INSERT OR REPLACE INTO results
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", (os.path.abspath(file_path),
+                                                 _serialize(options),
+                                                 status.st_size,
+                                                 status.st_mtime,
+                                                 content_hash,
+                                                 json.dumps(summary),
+                                                 now,
+                                                 now))
+        self.evict()
+
+    def evict(self):
+
+        """
+        Returns None.
+
+        Delete expired entries and the least recently used entries
+        beyond max_entries.
+        """
+
+        if self.ttl is not None:
+            self._connection.execute("""
+                DELETE FROM results
+                WHERE created < ?""", (time.time() - self.ttl,))
+        self._connection.execute("""
+            DELETE FROM results
+            WHERE rowid IN (
+                SELECT rowid
+                FROM results
+                ORDER BY accessed DESC, rowid DESC
+                LIMIT -1 OFFSET ?)""", (self.max_entries,))
+        self._connection.commit()
+
+
+def cached_validate(cache, file_path, **options):
+
+    """
+    Returns Dictionary.
+
+    The summary of validating the file, from the cache if the file is
+    unchanged. The summary has "cached" set to True if it came from the
+    cache.
+
+    Parameters
+    ----------
+    cache : ValidationCache
+    file_path : String
+        File name or path.
+    **options
+        Passed to main.validate().
+    """
+
+    summary = cache.get(file_path=file_path, options=options)
+    if summary is not None:
+        summary['cached'] = True
+        return summary
+
+    summary = main.validate(file_path=file_path, **options).to_dict()
+    cache.put(file_path=file_path, summary=summary, options=options)
+    summary['cached'] = False
+
+    return summary
+
+
+def hash_contents(file_path, block_size=1024 * 1024):
+
+    """
+    Returns String.
+
+    Hexadecimal MD5 hash of the file's contents.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    block_size : Integer, default 1 MiB
+    """
+
+    hash_ = hashlib.md5()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), ''):
+            hash_.update(block)
+
+    return hash_.hexdigest()
+
+
+def _serialize(options):
+    options = dict(options or dict())
+    if options.get('header_file_path'):
+        status = os.stat(options['header_file_path'])
+        options['header_file_signature'] = [status.st_size,
+                                            status.st_mtime,
+                                            status.st_ino]
+    return json.dumps(options, sort_keys=True)
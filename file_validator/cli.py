@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+
+"""
+Validate files non-interactively and write one JSON object per file.
+
+Examples
+--------
+    python -m file_validator data/students.csv
+    python -m file_validator --processes 4 '/drops/*.txt'
+    find /drops -name '*.csv' | python -m file_validator -
+    python -m file_validator --cache-dir ~/.cache/file_validator /drops
+    python -m file_validator feeds.zip students.csv.gz
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import multiprocessing.util
+import os
+import sys
+import zipfile
+
+from . import cache
+from . import main as validator
+from . import parallel
+
+DELIMITER_NAMES = {
+    'comma': ',',
+    'tab': '\t',
+    'pipe': '|',
+    'semicolon': ';',
+    'space': ' ',
+    'hyphen': '-'
+}
+
+# Each worker process opens the cache once and reuses it for every file
+# it is given.
+_cache = None
+
+
+def main(argv=None, stdin=None, stdout=None):
+
+    """
+    Returns Integer.
+
+    Run the command line interface. The exit status is 0 if every file
+    passed, and 1 if any file was skewed or could not be validated.
+
+    Parameters
+    ----------
+    argv : List, default None
+        Arguments, excluding the program name. If None, sys.argv is
+        used.
+    stdin : File, default None
+        Where "-" reads file paths from. If None, sys.stdin is used.
+    stdout : File, default None
+        Where the results are written. If None, sys.stdout is used.
+    """
+
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    arguments = parse_arguments(argv)
+
+    tasks = ((file_path,
+              member,
+              arguments.delimiter,
+              arguments.excel,
+              not arguments.no_header,
+              arguments.header_file,
+              arguments.profile,
+              arguments.confidence_threshold,
+              arguments.timings,
+              arguments.fail_fast,
+              _cache_settings(arguments))
+             for file_path in iter_file_paths(arguments.paths, stdin=stdin)
+             for member in _iter_members(file_path, excel=arguments.excel))
+
+    if arguments.processes == 1:
+        pool = None
+        summaries = itertools.imap(_validate, tasks)
+    else:
+        pool = multiprocessing.Pool(processes=arguments.processes)
+        summaries = pool.imap_unordered(_validate,
+                                        tasks,
+                                        chunksize=arguments.chunksize)
+
+    status = 0
+    try:
+        for summary in summaries:
+            stdout.write(json.dumps(summary, sort_keys=True) + '\n')
+            stdout.flush()
+            if summary.get('error') or summary.get('is_skewed'):
+                status = 1
+    except BaseException:
+        if pool is not None:
+            pool.terminate()
+        raise
+    else:
+        if pool is not None:
+            # Workers that exit normally close their caches.
+            pool.close()
+    finally:
+        if pool is not None:
+            pool.join()
+        _close_cache()
+
+    return status
+
+
+def parse_arguments(argv=None):
+
+    """
+    Returns argparse.Namespace.
+
+    Parameters
+    ----------
+    argv : List, default None
+    """
+
+    parser = argparse.ArgumentParser(
+        prog='python -m file_validator',
+        description=('Check delimited and Excel files for skewed records '
+                     'and write the results as JSON lines.'))
+    parser.add_argument(
+        'paths',
+        nargs='+',
+        metavar='PATH',
+        help=('file, directory or glob pattern to validate; "-" reads '
+              'one path per line from standard input'))
+    parser.add_argument(
+        '-d', '--delimiter',
+        type=_parse_delimiter,
+        help=('delimiter character or one of {names}; detected per file '
+              'if omitted').format(names=', '.join(sorted(DELIMITER_NAMES))))
+    parser.add_argument(
+        '--excel',
+        choices=['auto', 'yes', 'no'],
+        default='auto',
+        help='read files as Excel workbooks; "auto" goes by extension')
+    parser.add_argument(
+        '--no-header',
+        action='store_true',
+        help='the files have no header; requires --header-file')
+    parser.add_argument(
+        '--header-file',
+        metavar='PATH',
+        help='file holding the header for files without one')
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='include column profiles in the results')
+    parser.add_argument(
+        '--confidence-threshold',
+        type=float,
+        default=0.5,
+        help='minimum confidence for a detected delimiter (default: 0.5)')
+    parser.add_argument(
+        '-p', '--processes',
+        type=int,
+        default=1,
+        help='number of worker processes (default: 1)')
+    parser.add_argument(
+        '--chunksize',
+        type=int,
+        default=1,
+        help='number of files handed to a worker at a time (default: 1)')
+    parser.add_argument(
+        '--cache-dir',
+        metavar='PATH',
+        help=('reuse results for files whose size and modification time '
+              'are unchanged, cached in this directory'))
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        metavar='SECONDS',
+        help='maximum age of a cached result')
+    parser.add_argument(
+        '--cache-max-entries',
+        type=int,
+        default=100000,
+        help='number of cached results kept (default: 100000)')
+    parser.add_argument(
+        '--content-hash',
+        action='store_true',
+        help='also require the contents of a cached file to be unchanged')
+    parser.add_argument(
+        '--fail-fast',
+        type=int,
+        metavar='N',
+        help='stop reading a file once N skewed records have been found')
+    parser.add_argument(
+        '--timings',
+        action='store_true',
+        help=('include the time and peak memory of each stage in the '
+              'results; not recorded with --cache-dir'))
+
+    arguments = parser.parse_args(argv)
+    if arguments.no_header and not arguments.header_file:
+        parser.error('--no-header requires --header-file')
+
+    return arguments
+
+
+def iter_file_paths(paths, stdin):
+
+    """
+    Returns Generator.
+
+    Expand directories and glob patterns, and read paths from standard
+    input for "-". Paths that do not exist are kept so they are
+    reported.
+
+    Parameters
+    ----------
+    paths : List
+    stdin : File
+    """
+
+    for path in paths:
+        if path == '-':
+            for line in stdin:
+                line = line.strip()
+                if line:
+                    yield line
+        elif os.path.isdir(path) or any(character in path
+                                        for character in '*?['):
+            for file_path in parallel.find_files(path):
+                yield file_path
+        else:
+            yield path
+
+
+def _iter_members(file_path, excel):
+
+    """
+    Returns Iterator.
+
+    The members of a zip archive, which are validated on their own, or
+    just None for any other file.
+
+    Parameters
+    ----------
+    file_path : String
+    excel : String
+    """
+
+    is_excel = (validator.is_excel_file(file_path)
+                if excel == 'auto'
+                else excel == 'yes')
+    try:
+        # XLSX workbooks are zip archives too.
+        if not is_excel and validator.detect_compression(file_path) == 'zip':
+            return iter(validator.archive_members(file_path))
+    except (IOError, zipfile.BadZipfile):
+        # The error is reported when the file is validated.
+        pass
+
+    return iter([None])
+
+
+def _parse_delimiter(value):
+    delimiter = DELIMITER_NAMES.get(value.lower(), value.decode('string_escape'))
+    if len(delimiter) != 1:
+        raise argparse.ArgumentTypeError(
+            'the delimiter must be a single character')
+
+    return delimiter
+
+
+def _validate(task):
+
+    """
+    Returns Dictionary.
+
+    Validate one file. Any error is reported in the summary rather than
+    raised so one bad file does not stop the others.
+
+    Parameters
+    ----------
+    task : Tuple
+    """
+
+    (file_path,
+     member,
+     delimiter,
+     excel,
+     has_header,
+     header_file_path,
+     profile,
+     confidence_threshold,
+     timings,
+     fail_fast,
+     cache_settings) = task
+
+    options = {
+        'delimiter': delimiter,
+        'is_excel': (validator.is_excel_file(file_path)
+                     if excel == 'auto'
+                     else excel == 'yes'),
+        'has_header': has_header,
+        'header_file_path': header_file_path,
+        'profile': profile,
+        'confidence_threshold': confidence_threshold,
+        'member': member,
+        'fail_fast': fail_fast,
+        # Only the summary is written, so the records need not be kept,
+        # whether the file is delimited, compressed or a workbook.
+        'keep_records': False
+    }
+
+    try:
+        if cache_settings is None:
+            if timings:
+                options['timings'] = validator.Timings()
+            return validator.validate(file_path=file_path,
+                                      **options).to_dict()
+        return cache.cached_validate(_open_cache(cache_settings),
+                                     file_path=file_path,
+                                     **options)
+    except Exception as error:
+        return {
+            'file_path': file_path,
+            'member_name': member,
+            'error': '{name}: {error}'.format(name=type(error).__name__,
+                                              error=error)
+        }
+
+
+def _cache_settings(arguments):
+    if arguments.cache_dir is None:
+        return None
+
+    return {
+        'directory': arguments.cache_dir,
+        'max_entries': arguments.cache_max_entries,
+        'ttl': arguments.cache_ttl,
+        'use_content_hash': arguments.content_hash
+    }
+
+
+def _open_cache(cache_settings):
+    global _cache
+    if _cache is None:
+        _cache = cache.ValidationCache(**cache_settings)
+        # Runs when a worker process exits.
+        multiprocessing.util.Finalize(None, _close_cache, exitpriority=10)
+
+    return _cache
+
+
+def _close_cache():
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
+
+
+if __name__ == '__main__':
+    sys.exit(main())
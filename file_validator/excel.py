@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+
+"""
+Read XLS and XLSX workbooks one row at a time.
+
+XLSX workbooks are parsed directly from their archive; XLS workbooks
+are read with xlrd.
+"""
+
+import posixpath
+import zipfile
+from xml.etree import cElementTree
+
+# xlrd is slow to import and only XLS workbooks need it, so it is
+# imported where it is used.
+
+
+class ExcelWorkbook(object):
+
+    """
+    Read the sheets of an XLS or XLSX workbook one row at a time.
+
+    XLSX workbooks are parsed incrementally from the archive, so only
+    the shared strings and the current row are held in memory. XLS
+    workbooks are opened on demand and each sheet is unloaded once its
+    rows are exhausted.
+
+    Values are formatted as xlrd would; numbers are floats.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        if zipfile.is_zipfile(file_path):
+            self._archive = zipfile.ZipFile(file_path)
+            self._book = None
+            self._workbook_path = self._find_xlsx_part(
+                relationships_path='_rels/.rels',
+                type_='officeDocument',
+                default='xl/workbook.xml')
+            self._sheets = self._read_xlsx_sheets()
+            self._shared_strings = None
+        else:
+            import xlrd
+
+            self._archive = None
+            self._book = xlrd.open_workbook(file_path, on_demand=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self._archive is not None:
+            self._archive.close()
+        else:
+            self._book.release_resources()
+
+    def sheet_names(self):
+
+        """
+        Returns List.
+        """
+
+        if self._archive is not None:
+            return [name for name, _ in self._sheets]
+        else:
+            return self._book.sheet_names()
+
+    def iter_rows(self, sheet=0):
+
+        """
+        Returns Generator.
+
+        Lazily read the rows of a sheet. XLS and XLSX sheets are read
+        alike: trailing empty cells are not included, so rows are not
+        padded to the width of the sheet, and trailing empty rows are
+        dropped.
+
+        Parameters
+        ----------
+        sheet : Integer or String, default 0
+            Sheet index or name.
+        """
+
+        if isinstance(sheet, basestring):
+            sheet = self.sheet_names().index(sheet)
+
+        if self._archive is not None:
+            return self._iter_xlsx_rows(self._sheets[sheet][1])
+        else:
+            return self._iter_xls_rows(sheet)
+
+    def _iter_xls_rows(self, index):
+        # main imports this module, so it is imported here instead.
+        from . import main
+
+        worksheet = self._book.sheet_by_index(index)
+        empty_row_count = 0
+        try:
+            # xlrd pads each row to the width of the sheet.
+            for row_index in xrange(worksheet.nrows):
+                row = main._drop_trailing_empty_fields(
+                    [unicode(value) for value in worksheet.row_values(row_index)])
+                if not row:
+                    empty_row_count += 1
+                    continue
+                for _ in xrange(empty_row_count):
+                    yield list()
+                empty_row_count = 0
+                yield row
+        finally:
+            self._book.unload_sheet(index)
+
+    def _iter_xlsx_rows(self, path):
+        from . import main
+
+        # The shared strings are only read once a sheet is needed.
+        if self._shared_strings is None:
+            self._shared_strings = self._read_xlsx_shared_strings()
+
+        empty_row_count = 0
+        expected_row_index = 0
+
+        with self._archive.open(path) as file:
+            sheet_data = None
+            for event, element in cElementTree.iterparse(file,
+                                                         events=('start', 'end')):
+                name = _local_name(element.tag)
+                if event == 'start':
+                    if name == 'sheetData':
+                        sheet_data = element
+                    continue
+                if name != 'row':
+                    continue
+
+                row_index = int(element.get('r', expected_row_index + 1)) - 1
+                # Cells may hold an empty string.
+                row = main._drop_trailing_empty_fields(
+                    self._read_xlsx_row(element))
+                # Discard the parsed rows so memory stays constant.
+                sheet_data.clear()
+
+                # Rows without values are held back as a count so that
+                # trailing ones can be dropped.
+                empty_row_count += row_index - expected_row_index
+                expected_row_index = row_index + 1
+                if not row:
+                    empty_row_count += 1
+                    continue
+                for _ in xrange(empty_row_count):
+                    yield list()
+                empty_row_count = 0
+                yield row
+
+    def _read_xlsx_row(self, element):
+        row = list()
+
+        for cell in element:
+            if _local_name(cell.tag) != 'c':
+                continue
+            value = self._read_xlsx_value(cell)
+            if value is None:
+                continue
+
+            reference = cell.get('r')
+            column_index = (_column_index(reference)
+                            if reference
+                            else len(row))
+            row.extend([u''] * (column_index - len(row)))
+            row.append(value)
+
+        return row
+
+    def _read_xlsx_value(self, cell):
+        cell_type = cell.get('t', 'n')
+
+        if cell_type == 'inlineStr':
+            for child in cell:
+                if _local_name(child.tag) == 'is':
+                    return _read_string_item(child)
+            return None
+
+        value = None
+        for child in cell:
+            if _local_name(child.tag) == 'v':
+                value = child.text
+        if value is None:
+            return None
+
+        if cell_type == 's':
+            return self._shared_strings[int(value)]
+        elif cell_type == 'b':
+            return unicode(int(value))
+        elif cell_type in ('str', 'e'):
+            return unicode(value)
+        else:
+            return unicode(float(value))
+
+    def _read_xlsx_sheets(self):
+        relationships = self._read_xlsx_relationships(self._workbook_path)
+
+        sheets = list()
+        workbook = cElementTree.fromstring(
+            self._archive.read(self._workbook_path))
+        for element in workbook.iter():
+            if _local_name(element.tag) != 'sheet':
+                continue
+            relationship_id = next(value
+                                   for key, value in element.attrib.items()
+                                   if _local_name(key) == 'id')
+            sheets.append((element.get('name'),
+                           relationships[relationship_id][1]))
+
+        return sheets
+
+    def _read_xlsx_shared_strings(self):
+        path = self._find_xlsx_part(
+            relationships_path=_relationships_path(self._workbook_path),
+            type_='sharedStrings',
+            default=None)
+
+        shared_strings = list()
+        if path is None:
+            return shared_strings
+
+        with self._archive.open(path) as file:
+            for _, element in cElementTree.iterparse(file):
+                if _local_name(element.tag) != 'si':
+                    continue
+                shared_strings.append(_read_string_item(element))
+                element.clear()
+
+        return shared_strings
+
+    def _find_xlsx_part(self, relationships_path, type_, default):
+        try:
+            relationships = self._read_xlsx_relationships(
+                relationships_path,
+                is_package=True)
+        except KeyError:
+            return default
+
+        for relationship_type, target in relationships.values():
+            if relationship_type.endswith('/' + type_):
+                return target
+
+        return default
+
+    def _read_xlsx_relationships(self, path, is_package=False):
+
+        # Maps each relationship ID to its type and its absolute
+        # target path within the archive.
+        relationships_path = (path
+                              if is_package
+                              else _relationships_path(path))
+        base = posixpath.dirname(posixpath.dirname(relationships_path))
+        element = cElementTree.fromstring(
+            self._archive.read(relationships_path))
+
+        relationships = dict()
+        for relationship in element:
+            target = relationship.get('Target')
+            if target.startswith('/'):
+                target = target[1:]
+            else:
+                target = posixpath.normpath(posixpath.join(base, target))
+            relationships[relationship.get('Id')] = (relationship.get('Type'),
+                                                     target)
+
+        return relationships
+
+
+def _local_name(tag):
+
+    """
+    Returns String.
+
+    Strip the namespace from an XML tag or attribute name.
+    """
+
+    return tag.rsplit('}', 1)[-1]
+
+
+def _relationships_path(path):
+
+    """
+    Returns String.
+
+    Path of the relationships part describing an XLSX archive part.
+    """
+
+    directory, name = posixpath.split(path)
+    return posixpath.join(directory, '_rels', name + '.rels')
+
+
+def _read_string_item(element):
+
+    """
+    Returns Unicode.
+
+    Text of an XLSX string item, including each of its rich text runs.
+    Phonetic runs are not part of the displayed value.
+    """
+
+    parts = list()
+    for child in element:
+        name = _local_name(child.tag)
+        if name == 't':
+            parts.append(child.text or u'')
+        elif name == 'r':
+            parts.extend(run_child.text or u''
+                         for run_child in child
+                         if _local_name(run_child.tag) == 't')
+
+    return u''.join(parts)
+
+
+def _column_index(reference):
+
+    """
+    Returns Integer.
+
+    0-based column index of a cell reference such as "AB12".
+    """
+
+    column_index = 0
+    for character in reference:
+        if not character.isalpha():
+            break
+        column_index = column_index * 26 + ord(character.upper()) - ord('A') + 1
+
+    return column_index - 1
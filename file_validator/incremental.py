@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+
+"""
+Validate files that only ever grow, reading only what was appended.
+
+A Checkpoint records how far into the file validation got and the
+running statistics at that point. The next run resumes from the
+checkpoint, so its cost is proportional to the new data rather than to
+the whole file.
+"""
+
+import cPickle as pickle
+import csv
+import hashlib
+import os
+import tempfile
+
+from . import main
+from . import profiling
+
+# Number of bytes hashed at the start of the file, and just before the
+# checkpoint, to detect a file that was truncated or rewritten.
+PREFIX_SIZE = 64 * 1024
+TAIL_SIZE = 4 * 1024
+
+
+class Checkpoint(object):
+
+    """
+    Where validation of a growing file stopped, and its running results.
+
+    Parameters
+    ----------
+    delimiter : String
+        Character defining the boundary between record values.
+    header : List
+        Header read from a separate file, or None if the first record
+        of the file is the header.
+    statistics : SkewStatistics
+    profiler : ColumnProfiler, default None
+    """
+
+    def __init__(self, delimiter, header, statistics, profiler=None):
+        self.delimiter = delimiter
+        self.header = header
+        self.statistics = statistics
+        self.profiler = profiler
+        self.offset = 0
+        self.device = None
+        self.inode = None
+        self.prefix_hash = None
+        self.tail_hash = None
+        # Not saved; describe the last run only.
+        self.bytes_read = 0
+        self.is_restarted = True
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['bytes_read'], state['is_restarted']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.bytes_read = 0
+        self.is_restarted = False
+
+    @property
+    def is_skewed(self):
+        return self.statistics.is_skewed
+
+    def column_profiles(self):
+
+        """
+        Returns List.
+
+        One ColumnProfile per column, or an empty list if the columns
+        are not being profiled.
+        """
+
+        if self.profiler is None:
+            return list()
+
+        return self.profiler.column_profiles()
+
+    @classmethod
+    def load(cls, checkpoint_path):
+
+        """
+        Returns Checkpoint or None.
+
+        None if there is no checkpoint, or if it can not be read, such
+        as one saved by a version whose classes have since moved. The
+        file is then validated from the start.
+
+        Parameters
+        ----------
+        checkpoint_path : String
+            File name or path.
+        """
+
+        try:
+            file = open(checkpoint_path, 'rb')
+        except IOError:
+            return None
+
+        with file:
+            try:
+                return pickle.load(file)
+            except (pickle.UnpicklingError,
+                    AttributeError,
+                    ImportError,
+                    EOFError):
+                return None
+
+    def save(self, checkpoint_path):
+
+        """
+        Returns None.
+
+        The checkpoint is written to a temporary file and renamed into
+        place, so a crash never leaves a partial checkpoint behind.
+
+        Parameters
+        ----------
+        checkpoint_path : String
+            File name or path.
+        """
+
+        if self.profiler is not None:
+            # Fold buffered records into the sketches before pickling.
+            self.profiler.column_profiles()
+
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(checkpoint_path)))
+        with os.fdopen(file_descriptor, 'wb') as file:
+            pickle.dump(self, file, pickle.HIGHEST_PROTOCOL)
+        os.rename(temporary_path, checkpoint_path)
+
+    def matches(self, file):
+
+        """
+        Returns Boolean.
+
+        Determine if the file still starts with the bytes the checkpoint
+        was taken from. A file that is smaller than the checkpoint
+        offset, was replaced by another file, or whose first bytes or
+        bytes just before the offset differ is treated as rewritten.
+
+        Parameters
+        ----------
+        file : File
+        """
+
+        status = os.fstat(file.fileno())
+
+        return (status.st_size >= self.offset
+                and (status.st_dev, status.st_ino) == (self.device,
+                                                       self.inode)
+                and _hash_range(file, 0, PREFIX_SIZE, self.offset)
+                == self.prefix_hash
+                and _hash_range(file, self.offset - TAIL_SIZE, TAIL_SIZE,
+                                self.offset) == self.tail_hash)
+
+    def mark(self, file, offset):
+
+        """
+        Returns None.
+
+        Move the checkpoint to the offset.
+
+        Parameters
+        ----------
+        file : File
+        offset : Integer
+        """
+
+        status = os.fstat(file.fileno())
+        self.device = status.st_dev
+        self.inode = status.st_ino
+        self.offset = offset
+        self.prefix_hash = _hash_range(file, 0, PREFIX_SIZE, offset)
+        self.tail_hash = _hash_range(file, offset - TAIL_SIZE, TAIL_SIZE,
+                                     offset)
+
+
+def validate_appended(file_path,
+                      delimiter,
+                      checkpoint_path=None,
+                      header_file_path=None,
+                      profile=False):
+
+    """
+    Returns Checkpoint.
+
+    Validate the records appended to the file since the last checkpoint,
+    and save a new checkpoint. The whole file is validated if there is
+    no checkpoint, or if the file was truncated or rewritten since.
+
+    Only complete lines are consumed. A trailing partial line, or a
+    quoted field still open at the end of the file, is left for the
+    next run.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    delimiter : String
+        Character defining the boundary between record values.
+    checkpoint_path : String, default None
+        File name or path of the checkpoint. If None, ".checkpoint" is
+        appended to the file path.
+    header_file_path : String, default None
+        File name or path to the header. If None, the first record of
+        the file is the header.
+    profile : Boolean, default False
+        If True, the column sketches are kept in the checkpoint too.
+    """
+
+    if checkpoint_path is None:
+        checkpoint_path = file_path + '.checkpoint'
+
+    if header_file_path:
+        header = main.handle_header(header_file_path=header_file_path,
+                                    delimiter=delimiter)
+    else:
+        header = None
+
+    checkpoint = Checkpoint.load(checkpoint_path)
+
+    with open(file_path, 'rb') as file:
+        if (checkpoint is None
+                or checkpoint.delimiter != delimiter
+                or (profile and checkpoint.profiler is None)
+                or checkpoint.header != header
+                or not checkpoint.matches(file)):
+            checkpoint = Checkpoint(
+                delimiter=delimiter,
+                header=header,
+                statistics=main.SkewStatistics(
+                    header_width=None if header is None else len(header)),
+                profiler=(profiling.ColumnProfiler(header=header)
+                          if profile
+                          else None))
+
+        consumers = [checkpoint.statistics]
+        if checkpoint.profiler is not None:
+            consumers.append(checkpoint.profiler)
+
+        start = checkpoint.offset
+        offset = _consume(file=file,
+                          start=start,
+                          delimiter=delimiter,
+                          consumers=consumers)
+        checkpoint.mark(file=file, offset=offset)
+        checkpoint.bytes_read = offset - start
+
+    checkpoint.save(checkpoint_path)
+
+    return checkpoint
+
+
+def _consume(file, start, delimiter, consumers):
+
+    """
+    Returns Integer.
+
+    Feed the complete records from the start offset to the consumers.
+    The offset just past the last complete record is returned.
+
+    Parameters
+    ----------
+    file : File
+    start : Integer
+    delimiter : String
+    consumers : List
+        Objects with an update(record) method.
+    """
+
+    file.seek(start)
+    lines = main.ByteCounter(_complete_lines(file))
+
+    # Each record is held back until the next one is read, as the last
+    # record may be cut off inside a quoted field.
+    pending = None
+    pending_start = pending_end = 0
+    for record in csv.reader(lines, delimiter=delimiter):
+        if pending is not None:
+            for consumer in consumers:
+                consumer.update(pending)
+        pending = record
+        pending_start, pending_end = pending_end, lines.bytes_read
+
+    if pending is None:
+        return start
+
+    file.seek(start + pending_start)
+    if _is_cut_off(buffer=file.read(pending_end - pending_start),
+                   delimiter=delimiter):
+        return start + pending_start
+
+    for consumer in consumers:
+        consumer.update(pending)
+
+    return start + pending_end
+
+
+def _complete_lines(file):
+
+    """
+    Returns Generator.
+
+    Lines of the file from its current position, stopping before a
+    final line without a newline.
+
+    Parameters
+    ----------
+    file : File
+    """
+
+    for line in iter(file.readline, ''):
+        if not line.endswith('\n'):
+            return
+        yield line
+
+
+def _is_cut_off(buffer, delimiter):
+
+    """
+    Returns Boolean.
+
+    Determine if the buffer ends inside a quoted field.
+
+    Parameters
+    ----------
+    buffer : String
+    delimiter : String
+    """
+
+    try:
+        for _ in csv.reader(buffer.splitlines(True),
+                            delimiter=delimiter,
+                            strict=True):
+            pass
+    except csv.Error as error:
+        return str(error) == 'unexpected end of data'
+
+    return False
+
+
+def _hash_range(file, start, size, end):
+
+    """
+    Returns String.
+
+    Hexadecimal MD5 hash of up to size bytes from the start offset,
+    not reading past the end offset.
+
+    Parameters
+    ----------
+    file : File
+    start : Integer
+    size : Integer
+    end : Integer
+    """
+
+    start = max(start, 0)
+    file.seek(start)
+
+    return hashlib.md5(file.read(max(min(size, end - start), 0))).hexdigest()
@@ -2,13 +2,55 @@
 # -*- coding: utf-8 -*-
 
 import StringIO
+import bz2
+import collections
+import contextlib
 import csv
+import gzip
+import io
+import itertools
+import mmap
+import os
+import sys
+import time
 import warnings
+import zipfile
 
-import pandas as pd
-import tabulate
-import xlrd
-from nose.tools import assert_is_not_none
+import numpy as np
+
+from . import excel
+from . import profiling
+from . import tables
+
+# pandas and tabulate are slow to import and only some code paths
+# need them, so they are imported where they are used.
+
+try:
+    import lzma
+except ImportError:
+    # Python 2 has no lzma module; backports.lzma provides it.
+    try:
+        from backports import lzma
+    except ImportError:
+        lzma = None
+
+try:
+    import resource
+except ImportError:
+    # Windows has no resource module, so peak memory is not reported.
+    resource = None
+
+
+# The delimiters that can be chosen or detected, in prompt order.
+DELIMITERS = (',', '\t', '|', ';', ' ', '-')
+
+# The leading bytes of each compressed format that is read
+# transparently. An empty archive is still a zip file.
+MAGIC_NUMBERS = (('gzip', '\x1f\x8b'),
+                 ('bz2', 'BZh'),
+                 ('xz', '\xfd7zXZ\x00'),
+                 ('zip', 'PK\x03\x04'),
+                 ('zip', 'PK\x05\x06'))
 
 
 # Classes
@@ -18,6 +60,10 @@ class SkewedDataError(Exception):
     pass
 
 
+class DelimiterError(Exception):
+    pass
+
+
 class DataTable(list):
 
     @classmethod
@@ -37,7 +83,8 @@ class DataTable(list):
             Character defining the boundary between record values.
         """
 
-        buffer = open(file_path, 'rb').read()
+        with open_file(file_path) as file:
+            buffer = file.read()
         return DataTable.from_delimited_buffer(buffer=buffer,
                                                delimiter=delimiter)
 
@@ -69,22 +116,279 @@ class DataTable(list):
         Returns DataTable.
 
         Alternate constructor when converting from pandas' data frames.
+        The values are formatted as DataFrame.to_csv() would write them.
 
         Parameters
         ----------
         data_frame : pandas.DataFrame
         """
 
-        buffer = data_frame.to_csv(index=False)
-        return DataTable.from_delimited_buffer(buffer=buffer, delimiter=',')
+        return DataTable(iter_data_frame_records(data_frame=data_frame))
+
+    def to_data_frame(self):
+
+        """
+        Returns pandas.DataFrame.
+
+        The first record is used as the header. Empty values are
+        treated as missing and numeric columns are converted as
+        pandas.read_table() would.
+        """
+
+        import pandas as pd
+
+        data_frame = pd.DataFrame(self[1:], columns=self[0])
+        data_frame = data_frame.replace('', np.nan)
+        for column in data_frame:
+            data_frame[column] = pd.to_numeric(data_frame[column],
+                                               errors='ignore')
+
+        return data_frame
+
+
+class ByteCounter(object):
+
+    """
+    Iterate over the lines of a file while counting the bytes read.
+
+    Parameters
+    ----------
+    lines : Iterable
+    """
+
+    def __init__(self, lines):
+        self.bytes_read = 0
+        self._lines = iter(lines)
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        line = next(self._lines)
+        self.bytes_read += len(line)
+        return line
+
+
+class SkewStatistics(object):
+
+    """
+    Running statistics describing the record widths of a data set.
+
+    Records are consumed one at a time so only the statistics, and not
+    the records themselves, are kept in memory.
+
+    Parameters
+    ----------
+    header_width : Integer, default None
+        Number of fields in the header. If None, the width of the
+        first record consumed is used.
+    """
+
+    def __init__(self, header_width=None):
+        self.header_width = header_width
+        self.max_width = 0
+        self.record_count = 0
+        self.first_skewed_line_number = None
+
+    @property
+    def is_skewed(self):
+        return (self.header_width is not None
+                and self.max_width > self.header_width)
+
+    def update(self, record):
+
+        """
+        Returns None.
+
+        Consume one record.
+
+        Parameters
+        ----------
+        record : List
+        """
+
+        width = len(record)
+        self.record_count += 1
+
+        if self.header_width is None:
+            self.header_width = width
+        if width > self.max_width:
+            self.max_width = width
+        if (self.first_skewed_line_number is None
+                and width > self.header_width):
+            self.first_skewed_line_number = self.record_count
+
+
+class DataSource(object):
+
+    """
+    A delimited file or Excel sheet opened for a single pass.
+
+    The first few lines can be previewed without being read twice; they
+    are replayed in front of the rest of the file.
+
+    Delimited files may be compressed, in which case they are
+    decompressed as they are read.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    is_excel : Boolean, default False
+    sheet : Integer or String, default 0
+        Sheet index or name. Only used for Excel files.
+    member : String, default None
+        Name of the member to read if the file is a zip archive. Only
+        used for delimited files.
+    """
+
+    def __init__(self, file_path, is_excel=False, sheet=0, member=None):
+        self.file_path = file_path
+        self.is_excel = is_excel
+        self.member = member
+        self.compression = None
+        self._head = list()
+
+        if is_excel:
+            self._file = excel.ExcelWorkbook(file_path=file_path)
+            self._byte_counter = None
+            self._lines = self._file.iter_rows(sheet=sheet)
+        else:
+            self.compression = detect_compression(file_path)
+            self._file = open_file(file_path, member=member)
+            self._byte_counter = ByteCounter(self._file)
+            self._lines = self._byte_counter
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    @property
+    def bytes_read(self):
+
+        """
+        Number of bytes read so far, after decompression. Excel
+        workbooks are measured by their size on disk.
+        """
+
+        if self.is_excel:
+            return os.path.getsize(self.file_path)
+        else:
+            return self._byte_counter.bytes_read
+
+    def head(self, count=2):
+
+        """
+        Returns List.
+
+        The first lines, or rows if this is an Excel file.
+
+        Parameters
+        ----------
+        count : Integer, default 2
+        """
+
+        self._head.extend(itertools.islice(self._lines,
+                                           max(count - len(self._head), 0)))
+        return self._head[:count]
+
+    def sample(self, size=64 * 1024):
+
+        """
+        Returns String.
+
+        Whole lines from the start of a delimited file totalling at
+        least size bytes, or the whole file if it is smaller. Like the
+        preview, the sampled lines are replayed rather than read again.
+
+        Parameters
+        ----------
+        size : Integer, default 64 KiB
+        """
+
+        sample_size = sum(len(line) for line in self._head)
+        while sample_size < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._head.append(line)
+            sample_size += len(line)
+
+        return ''.join(self._head)
+
+    def lines(self):
+
+        """
+        Returns Iterator.
+
+        All lines, or rows if this is an Excel file, including those
+        already previewed. The source can only be iterated once.
+        """
+
+        return itertools.chain(self._head, self._lines)
+
+    def records(self, delimiter, quotechar='"'):
+
+        """
+        Returns Iterator.
+
+        Parameters
+        ----------
+        delimiter : String
+            Character defining the boundary between record values.
+            Ignored for Excel files.
+        quotechar : String, default '"'
+            Character quoting values that hold special characters.
+            Ignored for Excel files.
+        """
+
+        if self.is_excel:
+            return self.lines()
+        else:
+            return csv.reader(self.lines(),
+                              delimiter=delimiter,
+                              quotechar=quotechar)
 
 
 class ValidationResults(object):
 
+    # Diagnostic results are informational and may be left unset.
+    _diagnostics = ('header_width',
+                    'max_width',
+                    'skewed_records',
+                    'bytes_read',
+                    'source_record_count',
+                    'processed_record_count',
+                    'file_path',
+                    'sheet_name',
+                    'member_name',
+                    'quotechar',
+                    'stopped_line_number',
+                    'column_profiles',
+                    'timings')
+
     def __init__(self,
                  source_data_table=None,
                  processed_data_table=None,
-                 is_skewed=None):
+                 is_skewed=None,
+                 header_width=None,
+                 max_width=None,
+                 skewed_records=None,
+                 bytes_read=None,
+                 source_record_count=None,
+                 processed_record_count=None,
+                 file_path=None,
+                 sheet_name=None,
+                 member_name=None,
+                 quotechar=None,
+                 stopped_line_number=None,
+                 column_profiles=None,
+                 timings=None):
 
         # To track a new validation result:
         #   1. Add it as a new parameter to __init__()'s call signature.
@@ -100,10 +404,26 @@ class ValidationResults(object):
         #     # after
         #     def __init__(self, is_foo=None):
         #         self.is_foo = is_foo
+        #
+        # If the result is informational only, also add it to
+        # _diagnostics so validate() does not require it.
 
         self.source_data_table = source_data_table
         self.processed_data_table = processed_data_table
         self.is_skewed = is_skewed
+        self.header_width = header_width
+        self.max_width = max_width
+        self.skewed_records = skewed_records
+        self.bytes_read = bytes_read
+        self.source_record_count = source_record_count
+        self.processed_record_count = processed_record_count
+        self.file_path = file_path
+        self.sheet_name = sheet_name
+        self.member_name = member_name
+        self.quotechar = quotechar
+        self.stopped_line_number = stopped_line_number
+        self.column_profiles = column_profiles
+        self.timings = timings
 
     def validate(self):
 
@@ -126,309 +446,1795 @@ class ValidationResults(object):
         for result in results:
             if result == 'processed_data_table':
                 warnings.warn(message.format(result=result))
-            else:
-                assert_is_not_none(getattr(self, result),
-                                   msg=message.format(result=result))
+            elif result in self._diagnostics:
+                continue
+            elif callable(getattr(self, result)):
+                continue
+            elif getattr(self, result) is None:
+                raise AssertionError(message.format(result=result))
 
+    def to_dict(self):
 
-# Functions
-def handle_header(header_file_path, delimiter):
-    header_data_frame = pd.read_table(header_file_path, sep=delimiter)
-    headers = header_data_frame.columns.tolist()
+        """
+        Returns Dictionary.
 
-    return headers
+        JSON serializable summary of the results. The data tables are
+        summarized by their number of records, which are taken from the
+        record counts when set so lazy data tables are not read back.
+        """
 
+        def count(record_count, data_table):
+            if record_count is not None:
+                return record_count
+            return len(data_table) if data_table is not None else None
+
+        return {
+            'file_path': self.file_path,
+            'sheet_name': self.sheet_name,
+            'member_name': self.member_name,
+            'quotechar': self.quotechar,
+            'stopped_line_number': self.stopped_line_number,
+            'is_skewed': self.is_skewed,
+            'header_width': self.header_width,
+            'max_width': self.max_width,
+            'bytes_read': self.bytes_read,
+            'source_record_count': count(self.source_record_count,
+                                         self.source_data_table),
+            'processed_record_count': count(self.processed_record_count,
+                                            self.processed_data_table),
+            'skewed_records': (
+                [skewed_record._asdict() for skewed_record in self.skewed_records]
+                if self.skewed_records is not None
+                else None),
+            'column_profiles': (
+                [column_profile.to_dict()
+                 for column_profile in self.column_profiles]
+                if self.column_profiles is not None
+                else None),
+            'timings': (self.timings.stages
+                        if self.timings is not None
+                        else None)
+        }
 
-def handle_file_path(file_path):
-    index = file_path.rfind('.')
-    file_path_returned = file_path[:index] + '-with-header' + file_path[index:]
 
-    return file_path_returned
+class Timings(object):
 
+    """
+    Wall time, CPU time and peak memory of each stage of a validation.
 
-def print_skewness(file, delimiter):
-    data = [record for record in csv.reader(file, delimiter=delimiter)]
-    for row in data:
-        while row[-1] == '':
-            row.pop()
-        if len(row) > len(data[0]):
-            skewed_line_number = data.index(row) + 1
-            one_before = data.index(row) - 1
-            one_after = data.index(row) + 1
-            print 'The line number of the skewed row is: ', skewed_line_number
-            table = [data[0], data[one_before], row, data[one_after]]
-            print tabulate.tabulate(table)
+    Stages are timed with the stage() context manager and recorded in
+    the order they finish, so a nested stage is listed before the stage
+    containing it. Code that is not given a Timings skips the
+    measurements entirely.
 
+    Parameters
+    ----------
+    profiler : cProfile.Profile, default None
+        If given, it is enabled while any stage runs, so its statistics
+        cover exactly the timed stages.
+    """
 
-def print_headers(data_frame):
-    for column in data_frame:
-        print column + ': ' + str(len(data_frame[column].unique()))
-        if len(data_frame[column].unique()) <= 20:
-            for unique_value in data_frame[column].unique():
-                print ' - ' + str(unique_value)
-        print ''
+    def __init__(self, profiler=None):
+        self.profiler = profiler
+        self.stages = list()
+        self._depth = 0
 
+    def __getstate__(self):
+        # Profilers cannot be pickled.
+        state = self.__dict__.copy()
+        state['profiler'] = None
+        return state
 
-# TODO (duyn): Isolate the filesystem I/O to simplify testing.
-def is_not_skewed(file_path, delimiter, header_file_path=None):
+    @contextlib.contextmanager
+    def stage(self, name):
 
-    """
-    Returns Dictionary.
+        """
+        Returns Context Manager.
 
-    Determine if the data is skewed.
+        Time the body of the with statement. It is given the stage's
+        dictionary, to which it may add entries such as "bytes_read".
 
-    "Skewness" describes data where the longest record of the body is
-    longer than the header. Empty fields at the tail of the header are
-    not included in the count.
+        peak_mib is the peak resident memory of the process when the
+        stage ends, not the growth during the stage. It is None on
+        platforms without the resource module.
 
-    Parameters
+        Parameters
+        ----------
+        name : String
+        """
+
+        stage = {'stage': name}
+        if self.profiler is not None and not self._depth:
+            self.profiler.enable()
+        self._depth += 1
+        start_times = os.times()
+        start = time.time()
+        try:
+            yield stage
+        finally:
+            end = time.time()
+            end_times = os.times()
+            self._depth -= 1
+            if self.profiler is not None and not self._depth:
+                self.profiler.disable()
+            stage['wall_seconds'] = end - start
+            stage['cpu_seconds'] = ((end_times[0] + end_times[1])
+                                    - (start_times[0] + start_times[1]))
+            stage['peak_mib'] = _peak_memory()
+            self.stages.append(stage)
+
+    def annotate(self, name, **values):
+
+        """
+        Returns None.
+
+        Add entries to the most recent stage of that name.
+
+        Parameters
+        ----------
+        name : String
+        **values
+        """
+
+        for stage in reversed(self.stages):
+            if stage['stage'] == name:
+                stage.update(values)
+                return
+
+    def __str__(self):
+        import tabulate
+
+        return tabulate.tabulate(
+            [(stage['stage'],
+              stage['wall_seconds'],
+              stage['cpu_seconds'],
+              stage['peak_mib'],
+              stage.get('bytes_read')) for stage in self.stages],
+            headers=['stage', 'wall s', 'cpu s', 'peak MiB', 'bytes read'],
+            floatfmt='.3f')
+
+
+class _NullStage(object):
+
+    # Stands in for Timings.stage() when nothing is being timed.
+
+    def __enter__(self):
+        return dict()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class SniffedDialect(collections.namedtuple('SniffedDialect', ['delimiter',
+                                                            'quotechar',
+                                                            'confidence'])):
+
+    """
+    Delimiter and quote character detected from a sample.
+
+    Attributes
     ----------
-    file_path : String
-        File name or path.
     delimiter : String
-        Character defining the boundary between record values.
-    header_file_path : String, default None
-        File name or path to the header.
+    quotechar : String
+    confidence : Float
+        Between 0 and 1. The share of the sample's lines the delimiter
+        splits into more than one field.
     """
 
-    # NOTE (nancye): Sets are similar to lists except sets contain only
-    #   unique values. In addition, instead of using .append(), you use
-    #   .add().
-    line_lengths = dict()
-    data = list()
-    body_line_lengths = set()
+    __slots__ = ()
 
-    # NOTE (nancye): open() returns a file object.
-    with open(file_path, 'rb') as file:
-        # NOTE (nancye): csv.reader() is a function that accepts a
-        #   file object and returns an iterable.
-        for line in csv.reader(file, delimiter=delimiter):
-            data.append(line)
-            body_line_lengths.add(len(line))
-    line_lengths['body'] = max(body_line_lengths)
 
-    if header_file_path:
-        headers = handle_header(header_file_path=header_file_path,
-                                delimiter=delimiter)
-        line_lengths['header'] = len(headers)
-    else:
-        line_lengths['header'] = len(data[0])
+class SkewedRecord(collections.namedtuple('SkewedRecord', ['line_number',
+                                                        'header',
+                                                        'before',
+                                                        'record',
+                                                        'after'])):
+
+    """
+    A skewed record along with the records surrounding it.
 
-    return line_lengths['header'] >= line_lengths['body']
+    Attributes
+    ----------
+    line_number : Integer
+        1-based position of the record.
+    header : List
+    before : List
+        Records immediately preceding the skewed record.
+    record : List
+    after : List
+        Records immediately following the skewed record.
+    """
 
+    __slots__ = ()
 
-def convert_excel_to_csv(file_path):
+    @property
+    def table(self):
+        return [self.header] + self.before + [self.record] + self.after
+
+
+class SkewnessReporter(object):
 
     """
-    Returns String.
+    Collect skewed records, with context, in a single pass.
 
-    Read an XLS or XLSX file and write it formatted as a CSV.
+    Line numbers are tracked as records are consumed and only the
+    previous few records are buffered, so the data set is never held in
+    memory.
 
-    The destination file path is qualified with "_processed".
+    A record is skewed when it has more fields than the header,
+    counting trailing empty fields, as in SkewStatistics. The records
+    collected are shown without their trailing empty fields.
 
     Parameters
     ----------
-    file_path : String
-        File name or path.
+    header : List, default None
+        If None, the first record consumed is used.
+    limit : Integer, default None
+        Maximum number of skewed records to collect. If None, all are
+        collected.
+    context : Integer, default 1
+        Number of records to keep before and after each skewed record.
     """
 
-    new_file_path = file_path.split('.')[0] + '_converted.csv'
-    data = _primitive_read_excel(file_path=file_path)
+    def __init__(self, header=None, limit=None, context=1):
+        self.header = (_drop_trailing_empty_fields(header)
+                       if header is not None
+                       else None)
+        self.header_width = len(header) if header is not None else None
+        self.limit = limit
+        self.context = context
+        self.line_count = 0
+        self.skewed_records = list()
+        self._previous = collections.deque(maxlen=context)
+        self._pending = list()
+
+    @property
+    def is_done(self):
 
-    with open(new_file_path, 'wb') as file:
-        csv.writer(file).writerows(data)
+        """
+        True when the limit is reached and every collected record has
+        its trailing context.
+        """
 
-    return new_file_path
+        return (self.limit is not None
+                and not self._pending
+                and len(self.skewed_records) >= self.limit)
 
+    def update(self, record):
 
-def _primitive_read_excel(file_path):
+        """
+        Returns None.
 
-    """
-    Returns List.
+        Consume one record.
 
-    Read an XLS or XLSX file.
+        Parameters
+        ----------
+        record : List
+        """
 
-    Parameters
+        self.line_count += 1
+        width = len(record)
+        record = _drop_trailing_empty_fields(record)
+
+        for skewed_record in self._pending:
+            skewed_record.after.append(record)
+        while self._pending and len(self._pending[0].after) >= self.context:
+            self.skewed_records.append(self._pending.pop(0))
+
+        if self.header is None:
+            self.header = record
+            self.header_width = width
+        elif (width > self.header_width
+              and (self.limit is None
+                   or len(self.skewed_records) + len(self._pending) < self.limit)):
+            self._pending.append(SkewedRecord(line_number=self.line_count,
+                                              header=self.header,
+                                              before=list(self._previous),
+                                              record=record,
+                                              after=list()))
+
+        self._previous.append(record)
+
+    def close(self):
+
+        """
+        Returns None.
+
+        Flush skewed records still waiting on their trailing context.
+        """
+
+        self.skewed_records.extend(self._pending)
+        self._pending = list()
+
+
+class HeaderSchema(collections.namedtuple('HeaderSchema', ['file_path',
+                                                          'lines',
+                                                          'records'])):
+
+    """
+    A header file read and parsed once.
+
+    Attributes
     ----------
     file_path : String
-        File name or path.
+    lines : List
+        Raw lines of the file, for writing in front of a body.
+    records : List
+        The lines parsed with the csv module.
     """
 
-    data = list()
-    worksheet = xlrd.open_workbook(file_path).sheet_by_index(0)
+    __slots__ = ()
 
-    for row in worksheet.get_rows():
-        processed_row = list()
-        for cell in row:
-            processed_row.append(unicode(cell.value))
-        data.append(processed_row)
+    @property
+    def fields(self):
 
-    return data
+        """
+        List of the field names, from the first record.
+        """
 
+        return self.records[0] if self.records else list()
 
-def main(file_path='',
-         is_excel=None,
-         raw_delimiter='',
-         has_header=None,
-         header_file_path=''):
+    @property
+    def width(self):
+        return len(self.fields)
 
-    validation_results = ValidationResults()
 
-    # Ask for the file path.
-    file_path = file_path or raw_input('Please specify the full path to this data file: ')
+class HeaderRegistry(object):
 
-    # Ask if it is an XLS / XLSX file.
-    is_excel = (is_excel
-                if is_excel is not None
-                else raw_input('Is this an Excel file?  Y / n: ').lower() == 'y')
+    """
+    Header files parsed once and shared by every data file that uses
+    them.
 
-    if is_excel:
-        excel_file_path = convert_excel_to_csv(file_path=file_path)
-        # Redefine the existing file_path variable so the Excel file,
-        # which has now been converted to CSV, can move through the
-        # same validation pipeline.
-        file_path = excel_file_path
-        real_delimiter = ','
+    A header file is read again only when its modification time, size
+    or inode changes. Header files may also be registered under a name
+    and looked up by it. The schemas returned are shared and must not
+    be modified.
 
-        # Display the first couple of lines so the user can identify
-        # the delimiter.
-        # TODO (duyn): There will be bonus points for whoever can refactor this duplicated code.
-        with open(file_path) as file:
-            head = [next(file) for x in xrange(2)]
-        print head
-    else:
-        with open(file_path) as file:
-            head = [next(file) for x in xrange(2)]
-        print head
+    Parameters
+    ----------
+    max_entries : Integer, default 1024
+        Number of parsed headers kept. The least recently used are
+        dropped first.
+    """
 
-        # Ask for the delimiter.
-        delimiter_mapping = {
-            1: ',',
-            2: '\t',
-            3: '|',
-            4: ';',
-            5: ' ',
-            6: '-'
-        }
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._file_paths = dict()
+        self._schemas = collections.OrderedDict()
 
-        while True:
-            raw_delimiter = raw_delimiter or raw_input(
-                """According to the printed text, please enter the delimiter used in this file:
-                Type 1 for comma (,)
-                Type 2 for tab (   )
-                Type 3 for pipe character (|)
-                Type 4 for semicolon (;)
-                Type 5 for space ( )
-                Type 6 for hyphen (-)
-                """
-            )
-            try:
-                real_delimiter = delimiter_mapping[int(raw_delimiter)]
-                break
-            except (ValueError, KeyError):
-                print 'That is not a valid delimiter. Please try again.'
-            except KeyboardInterrupt:
-                break
+    def register(self, name, header_file_path):
 
-    while True:
-        # Ask if a header exists.
-        has_header = (has_header
-                      if has_header is not None
-                      else raw_input('Does this file have a header?  Y / n: ').lower() == 'y')
+        """
+        Returns None.
 
-        try:
-            if has_header:
-                if is_excel:
-                    # Replace the existing header with a processed one.
-                    with open(file_path) as file:
-                        data = [record for record in csv.reader(file)]
-                    header = data[0]
-
-                    processed_header = list()
-                    for field in header:
-                        if field != '':
-                            processed_header.append(field)
-                        else:
-                            break
-
-                    data[0] = processed_header
-                    with open(file_path, 'wb') as file:
-                        csv.writer(file).writerows(data)
-                if is_not_skewed(file_path=file_path, delimiter=real_delimiter):
-                    data_frame = pd.read_table(file_path, sep=real_delimiter)
-
-                    source_data_table = DataTable.from_data_frame(data_frame)
-                    validation_results.source_data_table = source_data_table
-                    validation_results.is_skewed = False
-
-                    print 'This file is not skewed. Please proceed to the next test. '
-                else:
-                    source_data_table = DataTable.from_delimited(
-                        file_path=file_path,
-                        delimiter=real_delimiter)
-                    validation_results.source_data_table = source_data_table
-                    validation_results.is_skewed = True
-                    raise SkewedDataError
-            else:
-                print 'This file does not have a header. Please append one.'
-                header_file_path = header_file_path or raw_input(
-                    """Please specify the full path to the headers file. \n"""
-                    """(NOTE: The extension of the header must match the extension of the original file \n"""
-                    """UNLESS the original file is an Excel file. In this case, headers must be formatted as CSV.): """)
-
-                # Read in the header.
-                with open(header_file_path, 'rb') as file:
-                    header = file.read()
-                # Read in the body.
-                with open(file_path, 'rb') as file:
-                    body = file.read()
-
-                # Create a file with the header and body data combined.
-                file_path_returned = handle_file_path(file_path)
-                with open(file_path_returned, 'wb') as file:
-                    file.writelines([header, body])
-
-                source_data_table = DataTable.from_delimited_buffer(
-                    buffer=body,
-                    delimiter=real_delimiter)
-                processed_data_table = DataTable.from_delimited_buffer(
-                    buffer=header + body,
-                    delimiter=real_delimiter)
-                validation_results.source_data_table = source_data_table
-                validation_results.processed_data_table = processed_data_table
-
-                if is_not_skewed(file_path=file_path,
-                                 delimiter=real_delimiter,
-                                 header_file_path=header_file_path):
-                    data_frame = pd.read_csv(file_path_returned, sep=real_delimiter)
-                    validation_results.is_skewed = False
-                    message = ("""The data is not skewed, now has a header, and """
-                               """has been returned to you for further testing.""")
-                    print message
-                else:
-                    validation_results.is_skewed = True
-                    raise SkewedDataError
-            # Display the fields labels along with the corresponding
-            # unique field values.
-            print_headers(data_frame)
-            break
-        # Catch the SkewedDataError and display the skewed line along
-        # with some context.
-        except SkewedDataError:
-            print 'Failure. This file is skewed.'
-            if has_header:
-                with open(file_path, 'rb') as file:
-                    print_skewness(file=file, delimiter=real_delimiter)
+        Refer to the header file by the name from now on.
+
+        Parameters
+        ----------
+        name : String
+        header_file_path : String
+            File name or path.
+        """
+
+        self._file_paths[name] = header_file_path
+
+    def get(self, name_or_path, delimiter, quotechar='"'):
+
+        """
+        Returns HeaderSchema.
+
+        Parameters
+        ----------
+        name_or_path : String
+            Registered name, or file name or path, of the header file.
+        delimiter : String
+            Character defining the boundary between record values.
+        quotechar : String, default '"'
+            Character quoting values that hold special characters.
+        """
+
+        file_path = self._file_paths.get(name_or_path, name_or_path)
+        status = os.stat(file_path)
+        signature = (status.st_mtime, status.st_size, status.st_ino)
+        key = (file_path, delimiter, quotechar)
+
+        entry = self._schemas.pop(key, None)
+        if entry is None or entry[0] != signature:
+            entry = (signature, read_header(file_path=file_path,
+                                            delimiter=delimiter,
+                                            quotechar=quotechar))
+        self._schemas[key] = entry
+        while len(self._schemas) > self.max_entries:
+            self._schemas.popitem(last=False)
+
+        return entry[1]
+
+    def clear(self):
+        self._schemas.clear()
+
+
+# Shared by every validation in the process.
+header_registry = HeaderRegistry()
+
+
+# Functions
+def read_header(file_path, delimiter, quotechar='"'):
+
+    """
+    Returns HeaderSchema.
+
+    Read and parse a header file, which may be compressed.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    delimiter : String
+        Character defining the boundary between record values.
+    quotechar : String, default '"'
+        Character quoting values that hold special characters.
+    """
+
+    with open_file(file_path) as file:
+        lines = file.readlines()
+    records = list(csv.reader(lines, delimiter=delimiter, quotechar=quotechar))
+
+    return HeaderSchema(file_path=file_path, lines=lines, records=records)
+
+
+def handle_header(header_file_path, delimiter):
+
+    """
+    Returns List.
+
+    The field names of a header file, parsed once per process with the
+    csv module and then taken from header_registry.
+
+    Parameters
+    ----------
+    header_file_path : String
+        Registered name, or file name or path, of the header file.
+    delimiter : String
+        Character defining the boundary between record values.
+    """
+
+    return list(header_registry.get(header_file_path,
+                                    delimiter=delimiter).fields)
+
+
+def handle_file_path(file_path):
+    index = file_path.rfind('.')
+    file_path_returned = file_path[:index] + '-with-header' + file_path[index:]
+
+    return file_path_returned
+
+
+def detect_compression(file_path):
+
+    """
+    Returns String or None.
+
+    "gzip", "bz2", "xz" or "zip" if the file starts with the magic
+    number of that format, otherwise None.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    """
+
+    with open(file_path, 'rb') as file:
+        start = file.read(6)
+
+    for compression, magic_number in MAGIC_NUMBERS:
+        if start.startswith(magic_number):
+            return compression
+
+    return None
+
+
+def open_file(file_path, member=None):
+
+    """
+    Returns File.
+
+    Open a file for reading in binary mode. Compressed files, detected
+    by their magic number, are decompressed as they are read.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    member : String, default None
+        Name of the member to read from a zip archive. If None, the
+        archive must have exactly one member.
+
+    Raises
+    ------
+    ValueError
+        If the file is a zip archive, no member is given and it does not
+        have exactly one member.
+    """
+
+    compression = detect_compression(file_path)
+
+    if compression is None:
+        return open(file_path, 'rb')
+    elif compression == 'gzip':
+        # GzipFile reads lines in Python; buffering it lets the csv
+        # module read them in C.
+        return io.BufferedReader(gzip.GzipFile(file_path, 'rb'),
+                                 buffer_size=_READ_BUFFER_SIZE)
+    elif compression == 'bz2':
+        return bz2.BZ2File(file_path, 'rb')
+    elif compression == 'xz':
+        if lzma is None:
+            raise ImportError('Reading "{file_path}" requires the lzma '
+                              'module, or backports.lzma on Python '
+                              '2.'.format(file_path=file_path))
+        return lzma.LZMAFile(file_path, 'rb')
+
+    if member is None:
+        members = archive_members(file_path)
+        if len(members) != 1:
+            message = ('"{file_path}" has {count} members. Give the member '
+                       'to read, or use validate_archive().')
+            raise ValueError(message.format(file_path=file_path,
+                                            count=len(members)))
+        member = members[0]
+    # The member keeps its own handle to the file once the archive is
+    # closed.
+    with zipfile.ZipFile(file_path) as archive:
+        return io.BufferedReader(archive.open(member),
+                                 buffer_size=_READ_BUFFER_SIZE)
+
+
+_READ_BUFFER_SIZE = 1024 * 1024
+
+
+def archive_members(file_path):
+
+    """
+    Returns List.
+
+    Names of the files in a zip archive, in archive order. Directories
+    are not included.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    """
+
+    with zipfile.ZipFile(file_path) as archive:
+        return [name for name in archive.namelist() if not name.endswith('/')]
+
+
+def read_records(file_path, delimiter, quotechar='"'):
+
+    """
+    Returns Generator.
+
+    Lazily read the records of a delimited file, which may be
+    compressed.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    delimiter : String
+        Character defining the boundary between record values.
+    quotechar : String, default '"'
+        Character quoting values that hold special characters.
+    """
+
+    # NOTE (nancye): open() returns a file object.
+    with open_file(file_path) as file:
+        # NOTE (nancye): csv.reader() is a function that accepts a
+        #   file object and returns an iterable.
+        for record in csv.reader(file,
+                                 delimiter=delimiter,
+                                 quotechar=quotechar):
+            yield record
+
+
+def iter_data_frame_records(data_frame, chunk_size=64 * 1024):
+
+    """
+    Returns Generator.
+
+    Lazily convert a pandas data frame to records, starting with the
+    header. The index is not included.
+
+    Values are formatted as DataFrame.to_csv() would write them, and
+    missing values become empty strings. The frame is formatted a
+    column at a time, chunk_size rows at a time, so the formatted
+    values of only one chunk are held at once.
+
+    Parameters
+    ----------
+    data_frame : pandas.DataFrame
+    chunk_size : Integer, default 64 KiB
+        Number of rows formatted at a time.
+    """
+
+    if data_frame.columns.nlevels > 1:
+        # Each level is written as its own header row.
+        buffer = data_frame.to_csv(index=False)
+        for record in csv.reader(StringIO.StringIO(buffer)):
+            yield record
+        return
+
+    yield [_format_value(name) for name in data_frame.columns]
+
+    for start in xrange(0, len(data_frame), chunk_size):
+        chunk = data_frame.iloc[start:start + chunk_size]
+        columns = [_format_column(chunk.iloc[:, index])
+                   for index in xrange(chunk.shape[1])]
+        if not columns:
+            for _ in xrange(len(chunk)):
+                yield list()
+            continue
+        for record in itertools.izip(*columns):
+            yield list(record)
+
+
+def _format_column(series):
+
+    """
+    Returns List.
+
+    The values of the series formatted as DataFrame.to_csv() would
+    write them.
+
+    Parameters
+    ----------
+    series : pandas.Series
+    """
+
+    values = series.values
+    kind = getattr(values, 'dtype', np.dtype(object)).kind
+
+    if kind in 'iub':
+        return values.astype(str).tolist()
+
+    if kind == 'f':
+        formatted_values = values.astype(str)
+        formatted_values[np.isnan(values)] = ''
+        return formatted_values.tolist()
+
+    if kind == 'O':
+        import pandas as pd
+
+        is_missing = pd.isnull(values)
+        return [
+            '' if is_missing[index] else _format_value(value)
+            for index, value in enumerate(values)
+        ]
+
+    # Dates, categories and other types are left to pandas.
+    buffer = series.to_frame().to_csv(index=False, header=False)
+    return [record[0] if record else ''
+            for record in csv.reader(StringIO.StringIO(buffer))]
+
+
+def _format_value(value):
+    if isinstance(value, basestring):
+        return value
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def measure_skewness(records, header_width=None, stop_on_skew=False):
+
+    """
+    Returns SkewStatistics.
+
+    Consume the records in a single pass.
+
+    Parameters
+    ----------
+    records : Iterable
+    header_width : Integer, default None
+        Number of fields in the header. If None, the first record is
+        treated as the header.
+    stop_on_skew : Boolean, default False
+        If True, stop at the first skewed record. The record count and
+        maximum width then only cover the records read.
+    """
+
+    statistics = SkewStatistics(header_width=header_width)
+    for record in records:
+        statistics.update(record)
+        if stop_on_skew and statistics.first_skewed_line_number is not None:
+            break
+
+    return statistics
+
+
+def measure_file_skewness(file_path,
+                          delimiter,
+                          header_width=None,
+                          stop_on_skew=False):
+
+    """
+    Returns SkewStatistics.
+
+    Measure the skewness of a delimited file.
+
+    The file is memory mapped, or decompressed in blocks if it is
+    compressed, and the delimiters on each line are counted in bulk
+    with NumPy. As soon as a quote character, a NUL
+    byte or a carriage return inside a line is seen, the file is parsed
+    with the csv module instead. Both give identical statistics.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    delimiter : String
+        Character defining the boundary between record values.
+    header_width : Integer, default None
+        Number of fields in the header. If None, the first record is
+        treated as the header.
+    stop_on_skew : Boolean, default False
+        If True, stop at the first skewed record, or at the end of the
+        block holding it. The record count and maximum width then only
+        cover the records read.
+    """
+
+    if detect_compression(file_path) is not None:
+        with open_file(file_path) as file:
+            statistics = _measure_unquoted_skewness(
+                blocks=_iter_stream_blocks(file),
+                delimiter=delimiter,
+                header_width=header_width,
+                stop_on_skew=stop_on_skew)
+        if statistics is not None:
+            return statistics
+    else:
+        with open(file_path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return SkewStatistics(header_width=header_width)
+
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                statistics = _measure_unquoted_skewness(
+                    blocks=(block for _, block in _iter_blocks(buffer)),
+                    delimiter=delimiter,
+                    header_width=header_width,
+                    stop_on_skew=stop_on_skew)
+                if statistics is not None:
+                    return statistics
+            finally:
+                buffer.close()
+
+    return measure_skewness(
+        records=read_records(file_path=file_path, delimiter=delimiter),
+        header_width=header_width,
+        stop_on_skew=stop_on_skew)
+
+
+# Large enough to amortize NumPy's per-call overhead, small enough
+# that the temporary index arrays stay modest.
+_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+def _measure_unquoted_skewness(blocks,
+                               delimiter,
+                               header_width=None,
+                               stop_on_skew=False):
+
+    """
+    Returns SkewStatistics or None.
+
+    Measure the skewness of a file that has no quoting. A line's width
+    is its number of delimiters plus one, or zero if it is empty, just
+    as csv.reader() would parse it. None is returned if the file needs
+    the csv module after all.
+
+    The file is processed in blocks of whole lines so the temporary
+    arrays stay bounded.
+
+    Parameters
+    ----------
+    blocks : Iterable
+        Blocks of whole lines as unsigned 8-bit integers.
+    delimiter : String
+    header_width : Integer, default None
+    stop_on_skew : Boolean, default False
+        If True, stop after the first block with a skewed line.
+    """
+
+    statistics = SkewStatistics(header_width=header_width)
+
+    for block in blocks:
+        widths = _count_widths(block=block, delimiter=delimiter)
+        del block
+        if widths is None:
+            return None
+
+        if statistics.header_width is None:
+            statistics.header_width = int(widths[0])
+        is_skewed = widths > statistics.header_width
+        if statistics.first_skewed_line_number is None and is_skewed.any():
+            statistics.first_skewed_line_number = (
+                statistics.record_count + int(is_skewed.argmax()) + 1)
+        statistics.record_count += len(widths)
+        statistics.max_width = max(statistics.max_width, int(widths.max()))
+        if stop_on_skew and statistics.first_skewed_line_number is not None:
+            break
+
+    return statistics
+
+
+def _iter_blocks(buffer):
+
+    """
+    Returns Generator.
+
+    The offset and bytes of each block of whole lines of a memory
+    mapped file, as unsigned 8-bit integers. Each block is about
+    _BLOCK_SIZE bytes so the temporary arrays built from it stay
+    bounded.
+
+    Parameters
+    ----------
+    buffer : mmap.mmap
+    """
+
+    size = len(buffer)
+    start = 0
+
+    while start < size:
+        # Extend the block to the end of its last line.
+        end = min(start + _BLOCK_SIZE, size)
+        if end < size:
+            newline = buffer.rfind('\n', start, end)
+            if newline == -1:
+                newline = buffer.find('\n', end)
+            end = newline + 1 if newline != -1 else size
+
+        yield start, np.frombuffer(buffer,
+                                   dtype=np.uint8,
+                                   count=end - start,
+                                   offset=start)
+        start = end
+
+
+def _iter_stream_blocks(file):
+
+    """
+    Returns Generator.
+
+    The bytes of each block of whole lines read from a file that can
+    not be memory mapped, such as a decompressed stream, as unsigned
+    8-bit integers. Each block is about _BLOCK_SIZE bytes.
+
+    Parameters
+    ----------
+    file : File
+    """
+
+    remainder = ''
+
+    while True:
+        data = file.read(_BLOCK_SIZE)
+        if not data:
+            break
+        data = remainder + data
+        end = data.rfind('\n') + 1
+        remainder = data[end:]
+        if end:
+            yield np.frombuffer(data, dtype=np.uint8, count=end)
+
+    if remainder:
+        yield np.frombuffer(remainder, dtype=np.uint8)
+
+
+def _count_widths(block, delimiter):
+
+    """
+    Returns numpy.ndarray or None.
+
+    Number of fields on each line of a block of whole lines. None if
+    the block has a quote character, a NUL byte or a carriage return
+    other than at the end of a line.
+
+    Parameters
+    ----------
+    block : numpy.ndarray
+        Bytes as unsigned 8-bit integers.
+    delimiter : String
+    """
+
+    if _needs_csv(block):
+        return None
+
+    # Find the delimiters and newlines together; the number of
+    # delimiters on a line is then the gap between consecutive
+    # newlines among them.
+    is_newline = block == ord('\n')
+    events = np.flatnonzero(is_newline | (block == ord(delimiter)))
+    event_line_ends = np.flatnonzero(is_newline[events])
+    line_ends = events[event_line_ends]
+    if not len(line_ends) or line_ends[-1] != len(block) - 1:
+        event_line_ends = np.append(event_line_ends, len(events))
+        line_ends = np.append(line_ends, len(block))
+
+    widths = np.diff(np.concatenate(([-1], event_line_ends)))
+
+    # Lines with no content, other than a carriage return, have no
+    # fields.
+    line_starts = np.concatenate(([0], line_ends[:-1] + 1))
+    lengths = line_ends - line_starts
+    has_carriage_return = np.zeros(len(lengths), dtype=bool)
+    has_carriage_return[lengths > 0] = (
+        block[line_ends[lengths > 0] - 1] == ord('\r'))
+    widths[(lengths - has_carriage_return) == 0] = 0
+
+    return widths
+
+
+def _needs_csv(block, quotechar='"'):
+
+    """
+    Returns Boolean.
+
+    Determine if a block of whole lines has a quote character, a NUL
+    byte or a carriage return other than at the end of a line, any of
+    which only the csv module parses correctly.
+
+    Parameters
+    ----------
+    block : numpy.ndarray
+        Bytes as unsigned 8-bit integers.
+    quotechar : String, default '"'
+    """
+
+    if (block == ord(quotechar)).any() or (block == 0).any():
+        return True
+    carriage_returns = np.flatnonzero(block == ord('\r')) + 1
+    if (carriage_returns[-1:] == len(block)).any():
+        return True
+
+    return bool((block[carriage_returns] != ord('\n')).any())
+
+
+def sniff_dialect(sample, delimiters=DELIMITERS):
+
+    """
+    Returns SniffedDialect.
+
+    Detect the delimiter and quote character of a sample of delimited
+    data.
+
+    Each candidate delimiter is scored by the share of lines it splits
+    into more than one field. Whether the lines split into as many
+    fields as the header does not count, as skewed files must still be
+    detected. Ties go to the candidate that splits the most lines into
+    the same number of fields, then to the earlier candidate in
+    delimiters, so characters that often appear within values, such as
+    spaces and hyphens, lose to the delimiter proper. The confidence is
+    the best score. csv.Sniffer detects the quote character.
+
+    Parameters
+    ----------
+    sample : String
+        Whole lines from the start of the data.
+    delimiters : Iterable, default DELIMITERS
+        Candidate delimiters, in order of preference.
+    """
+
+    try:
+        quotechar = csv.Sniffer().sniff(sample,
+                                        delimiters=''.join(delimiters)).quotechar
+    except csv.Error:
+        quotechar = '"'
+
+    lines = sample.splitlines(True)
+    scores = list()
+    for index, delimiter in enumerate(delimiters):
+        widths = [len(record)
+                  for record in csv.reader(lines,
+                                           delimiter=delimiter,
+                                           quotechar=quotechar)
+                  if record]
+        if not widths:
+            continue
+        split_share = float(sum(1 for width in widths if width > 1)) / len(widths)
+        width, count = collections.Counter(widths).most_common(1)[0]
+        scores.append((split_share,
+                       float(count) / len(widths),
+                       -index,
+                       delimiter))
+
+    scores.sort(reverse=True)
+    if not scores or scores[0][0] == 0:
+        return SniffedDialect(delimiter=None, quotechar=quotechar, confidence=0.0)
+
+    return SniffedDialect(delimiter=scores[0][3],
+                          quotechar=quotechar,
+                          confidence=scores[0][0])
+
+
+def print_skewness(file, delimiter, limit=None):
+
+    """
+    Returns None.
+
+    Print each skewed record along with its line number, the header and
+    the records on either side.
+
+    Parameters
+    ----------
+    file : File
+    delimiter : String
+        Character defining the boundary between record values.
+    limit : Integer, default None
+        Maximum number of skewed records to print. If None, all are
+        printed.
+    """
+
+    reporter = SkewnessReporter(limit=limit)
+    for record in csv.reader(file, delimiter=delimiter):
+        reporter.update(record)
+        if reporter.is_done:
+            break
+    reporter.close()
+
+    print_skewed_records(reporter.skewed_records)
+
+
+def print_skewed_records(skewed_records):
+    import tabulate
+
+    for skewed_record in skewed_records:
+        print 'The line number of the skewed row is: ', skewed_record.line_number
+        print tabulate.tabulate(skewed_record.table)
+
+
+def print_headers(data_frame):
+    for column_profile in profiling.profile_columns(data_frame):
+        print unicode(column_profile).encode('utf-8')
+
+
+# TODO (duyn): Isolate the filesystem I/O to simplify testing.
+def is_not_skewed(file_path, delimiter, header_file_path=None):
+
+    """
+    Returns Boolean.
+
+    Determine if the data is not skewed.
+
+    "Skewness" describes data where the longest record of the body is
+    longer than the header. Empty fields at the tail of the header are
+    not included in the count.
+
+    The file is streamed so memory use is constant regardless of its
+    size, and reading stops at the first skewed record. Unquoted files
+    take a faster, memory mapped path.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    delimiter : String
+        Character defining the boundary between record values.
+    header_file_path : String, default None
+        File name or path to the header, or its name in
+        header_registry.
+    """
+
+    if header_file_path:
+        headers = handle_header(header_file_path=header_file_path,
+                                delimiter=delimiter)
+        header_width = len(headers)
+    else:
+        header_width = None
+
+    statistics = measure_file_skewness(file_path=file_path,
+                                       delimiter=delimiter,
+                                       header_width=header_width,
+                                       stop_on_skew=True)
+
+    return not statistics.is_skewed
+
+
+def validate_records(records,
+                     header_records=None,
+                     limit=None,
+                     profile=False,
+                     keep_records=True,
+                     timings=None,
+                     fail_fast=None):
+
+    """
+    Returns ValidationResults.
+
+    Run the skew check, the skewed record report and the data table
+    construction over the records in a single pass. The first record
+    is treated as the header.
+
+    The records are kept in a CompactDataTable. When header records
+    are given, the source data table holds only the records and the
+    processed data table holds both, sharing the same storage.
+
+    Parameters
+    ----------
+    records : Iterable
+    header_records : List, default None
+    limit : Integer, default None
+        Maximum number of skewed records to report. If None, all are
+        reported.
+    profile : Boolean, default False
+        If True, the columns are profiled in the same pass with
+        ColumnProfiler. This costs a few microseconds per value.
+    keep_records : Boolean, default True
+        If False, the records are not kept and the data tables are left
+        unset. The record counts are set either way.
+    timings : Timings, default None
+        If given, the pass over the records and the column profiling
+        are timed as the "read_records" and "profile_columns" stages.
+    fail_fast : Integer, default None
+        If given, stop reading once this many skewed records have been
+        collected along with their trailing context. The line number of
+        the last record read is set as stopped_line_number, and every
+        other result only covers the records read. If None, all records
+        are read.
+    """
+
+    if fail_fast is not None:
+        limit = fail_fast if limit is None else min(limit, fail_fast)
+
+    data_table = tables.CompactDataTable(header_records) if keep_records else None
+    statistics = SkewStatistics()
+    reporter = SkewnessReporter(limit=limit)
+    consumers = [statistics, reporter]
+    if profile:
+        profiler = profiling.ColumnProfiler()
+        consumers.append(profiler)
+
+    for record in header_records or list():
+        for consumer in consumers:
+            consumer.update(record)
+    updates = [consumer.update for consumer in consumers]
+    if keep_records:
+        updates.append(data_table.append)
+    stopped_line_number = None
+    with _stage(timings, 'read_records'):
+        if fail_fast is None:
+            for record in records:
+                for update in updates:
+                    update(record)
+        else:
+            for record in records:
+                for update in updates:
+                    update(record)
+                # The statistics are checked first as they are cheaper.
+                if (statistics.first_skewed_line_number is not None
+                        and reporter.is_done):
+                    stopped_line_number = reporter.line_count
+                    break
+        reporter.close()
+
+    if profile:
+        with _stage(timings, 'profile_columns'):
+            column_profiles = profiler.column_profiles()
+    else:
+        column_profiles = None
+
+    if header_records:
+        source_record_count = statistics.record_count - len(header_records)
+        processed_record_count = statistics.record_count
+    else:
+        source_record_count = statistics.record_count
+        processed_record_count = None
+
+    if not keep_records:
+        source_data_table = processed_data_table = None
+    elif header_records:
+        source_data_table = data_table.tail(len(header_records))
+        processed_data_table = data_table
+    else:
+        source_data_table = data_table
+        processed_data_table = None
+
+    validation_results = ValidationResults(
+        source_data_table=source_data_table,
+        processed_data_table=processed_data_table,
+        is_skewed=statistics.is_skewed,
+        header_width=statistics.header_width,
+        max_width=statistics.max_width,
+        skewed_records=reporter.skewed_records,
+        source_record_count=source_record_count,
+        processed_record_count=processed_record_count,
+        stopped_line_number=stopped_line_number,
+        column_profiles=column_profiles,
+        timings=timings)
+
+    return validation_results
+
+
+def validate_source(source,
+                    delimiter,
+                    has_header=True,
+                    header_file_path=None,
+                    file_path_returned=None,
+                    profile=False,
+                    lazy=False,
+                    timings=None,
+                    fail_fast=None,
+                    quotechar='"',
+                    keep_records=True):
+
+    """
+    Returns ValidationResults.
+
+    Validate a data source in a single pass without prompting or
+    printing.
+
+    Parameters
+    ----------
+    source : DataSource
+    delimiter : String
+        Character defining the boundary between record values.
+    has_header : Boolean, default True
+    header_file_path : String, default None
+        File name or path to the header, or its name in
+        header_registry. Used when has_header is False.
+        Headers for Excel files must be formatted as CSV.
+    file_path_returned : String, default None
+        If given and has_header is False, the header and body are
+        written to this file as they are validated.
+    profile : Boolean, default False
+        If True, the columns are profiled in the same pass.
+    lazy : Boolean, default False
+        If True, the records of delimited files are not kept; the data
+        tables are LazyDataTable that read records back from the file
+        on access. Ignored for Excel files and compressed files, which
+        can not be read back by offset.
+    timings : Timings, default None
+        If given, each stage of the validation is timed.
+    fail_fast : Integer, default None
+        If given, stop once this many skewed records have been found;
+        see validate_records(). bytes_read is then how far into the
+        source it got. The file returned is still written in full, but
+        the rest of the source is copied without being parsed. Lazy
+        data tables are left unset.
+    quotechar : String, default '"'
+        Character quoting values that hold special characters. Ignored
+        for Excel files.
+    keep_records : Boolean, default True
+        If False, the data tables are left unset and only the record
+        counts are reported. This takes the least memory for any
+        source, including Excel and compressed files.
+    """
+
+    lazy = (keep_records
+            and lazy
+            and not source.is_excel
+            and source.compression is None)
+
+    if has_header:
+        records = source.records(delimiter=delimiter, quotechar=quotechar)
+        if source.is_excel:
+            # Replace the existing header with a processed one.
+            records = _trim_header(records)
+
+        validation_results = validate_records(records=records,
+                                              profile=profile,
+                                              keep_records=(keep_records
+                                                            and not lazy),
+                                              timings=timings,
+                                              fail_fast=fail_fast)
+        if lazy and validation_results.stopped_line_number is None:
+            validation_results.source_data_table = tables.LazyDataTable(
+                file_path=source.file_path,
+                delimiter=delimiter,
+                quotechar=quotechar)
+        validation_results.bytes_read = source.bytes_read
+        validation_results.file_path = source.file_path
+        validation_results.member_name = source.member
+        validation_results.quotechar = None if source.is_excel else quotechar
+        if timings is not None:
+            timings.annotate('read_records', bytes_read=source.bytes_read)
+
+        return validation_results
+
+    # Read in the header. The body is never read into memory; it is
+    # chained behind the header instead.
+    with _stage(timings, 'read_header'):
+        header_schema = header_registry.get(header_file_path,
+                                            delimiter=delimiter,
+                                            quotechar=quotechar)
+        header_lines = header_schema.lines
+        header_records = header_schema.records
+
+    # Create a file with the header and body data combined by writing
+    # each line as it is validated.
+    if file_path_returned:
+        file_returned = open(file_path_returned, 'wb')
+        file_returned.writelines(header_lines)
+        if source.is_excel:
+            rows = source.records(delimiter=delimiter)
+            writer = csv.writer(file_returned)
+            records = _tee_records(records=rows, writer=writer)
+        else:
+            lines = source.lines()
+            records = csv.reader(_tee_lines(lines=lines, file=file_returned),
+                                 delimiter=delimiter,
+                                 quotechar=quotechar)
+    else:
+        records = source.records(delimiter=delimiter, quotechar=quotechar)
+
+    try:
+        validation_results = validate_records(records=records,
+                                              header_records=header_records,
+                                              profile=profile,
+                                              keep_records=(keep_records
+                                                            and not lazy),
+                                              timings=timings,
+                                              fail_fast=fail_fast)
+        bytes_read = source.bytes_read
+        if (file_path_returned
+                and validation_results.stopped_line_number is not None):
+            # Each record read so far has been written; copy the rest.
+            if source.is_excel:
+                writer.writerows(rows)
             else:
-                with open(file_path_returned, 'rb') as file:
-                    print_skewness(file=file, delimiter=real_delimiter)
+                file_returned.writelines(lines)
+    finally:
+        if file_path_returned:
+            file_returned.close()
+    if lazy and validation_results.stopped_line_number is None:
+        validation_results.source_data_table = tables.LazyDataTable(
+            file_path=source.file_path,
+            delimiter=delimiter,
+            quotechar=quotechar)
+        validation_results.processed_data_table = tables.LazyDataTable(
+            file_path=source.file_path,
+            delimiter=delimiter,
+            header_records=header_records,
+            quotechar=quotechar)
+    validation_results.bytes_read = (
+        bytes_read + sum(len(line) for line in header_lines))
+    validation_results.file_path = source.file_path
+    validation_results.member_name = source.member
+    validation_results.quotechar = None if source.is_excel else quotechar
+    if timings is not None:
+        timings.annotate('read_records', bytes_read=bytes_read)
+
+    return validation_results
+
+
+def validate(file_path,
+             delimiter=None,
+             is_excel=False,
+             has_header=True,
+             header_file_path=None,
+             file_path_returned=None,
+             profile=False,
+             confidence_threshold=0.5,
+             lazy=False,
+             timings=None,
+             member=None,
+             fail_fast=None,
+             quotechar=None,
+             keep_records=True):
+
+    """
+    Returns ValidationResults.
+
+    Validate a file without prompting or printing. Delimited files
+    compressed with gzip, bzip2, xz or zip are decompressed as they are
+    read.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    delimiter : String, default None
+        Character defining the boundary between record values. If None,
+        it is detected from a sample of the file. Ignored for Excel
+        files.
+    is_excel : Boolean, default False
+    has_header : Boolean, default True
+    header_file_path : String, default None
+        File name or path to the header, or its name in
+        header_registry. Used when has_header is False.
+    file_path_returned : String, default None
+        If given and has_header is False, the header and body are
+        written to this file.
+    profile : Boolean, default False
+        If True, the columns are profiled in the same pass.
+    confidence_threshold : Float, default 0.5
+        Minimum confidence for a detected delimiter.
+    lazy : Boolean, default False
+        If True, the records of uncompressed delimited files are read
+        back from the file on access rather than kept in memory.
+    timings : Timings, default None
+        If given, each stage of the validation is timed and the timings
+        are set on the results.
+    member : String, default None
+        Name of the member to validate if the file is a zip archive. If
+        None, the archive must have exactly one member.
+    fail_fast : Integer, default None
+        If given, stop reading once this many skewed records have been
+        found. See validate_source().
+    quotechar : String, default None
+        Character quoting values that hold special characters. If None,
+        it is detected along with the delimiter, or is '"' if the
+        delimiter is given. Ignored for Excel files.
+    keep_records : Boolean, default True
+        If False, the data tables are left unset and only the record
+        counts are reported. See validate_source().
+
+    Raises
+    ------
+    DelimiterError
+        If the delimiter is not given and could not be detected.
+    """
+
+    with DataSource(file_path=file_path,
+                    is_excel=is_excel,
+                    member=member) as source:
+        if is_excel:
+            delimiter = ','
+        elif delimiter is None:
+            with _stage(timings, 'sniff_dialect'):
+                sniffed_dialect = sniff_dialect(source.sample())
+            if sniffed_dialect.confidence < confidence_threshold:
+                message = 'The delimiter of "{file_path}" could not be detected.'
+                raise DelimiterError(message.format(file_path=file_path))
+            delimiter = sniffed_dialect.delimiter
+            quotechar = quotechar or sniffed_dialect.quotechar
+
+        return validate_source(source=source,
+                               delimiter=delimiter,
+                               has_header=has_header,
+                               header_file_path=header_file_path,
+                               file_path_returned=file_path_returned,
+                               profile=profile,
+                               lazy=lazy,
+                               timings=timings,
+                               fail_fast=fail_fast,
+                               quotechar=quotechar or '"',
+                               keep_records=keep_records)
+
+
+def validate_archive(file_path, **options):
+
+    """
+    Returns List.
+
+    Validate each member of a zip archive on its own, as a delimited
+    file. One ValidationResults is returned per member, in archive
+    order, with member_name set.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    **options
+        Passed to validate().
+    """
+
+    return [validate(file_path=file_path, member=member, **options)
+            for member in archive_members(file_path)]
+
+
+def is_excel_file(file_path):
+
+    """
+    Returns Boolean.
+
+    Whether the file is an XLS or XLSX workbook, judging by its
+    extension.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    """
+
+    return file_path.lower().endswith(('.xls', '.xlsx'))
+
+
+def _tee_lines(lines, file):
+
+    """
+    Returns Generator.
+
+    Write each line to the file as it is read.
+
+    Parameters
+    ----------
+    lines : Iterable
+    file : File
+    """
+
+    for line in lines:
+        file.write(line)
+        yield line
+
+
+def _tee_records(records, writer):
+
+    """
+    Returns Generator.
+
+    Write each record with the CSV writer as it is read.
+
+    Parameters
+    ----------
+    records : Iterable
+    writer : csv.writer
+    """
+
+    for record in records:
+        writer.writerow(record)
+        yield record
+
+
+def _trim_header(records):
+
+    """
+    Returns Generator.
+
+    Drop the header's fields from the first empty one onwards. Excel
+    pads the header with empty cells to the width of the sheet.
+
+    Parameters
+    ----------
+    records : Iterable
+    """
+
+    records = iter(records)
+    header = next(records, None)
+    if header is None:
+        return
+
+    processed_header = list()
+    for field in header:
+        if field != '':
+            processed_header.append(field)
+        else:
             break
-        except (KeyError, ValueError):
-            print 'That is not a valid response. Please try again.'
+    yield processed_header
+
+    for record in records:
+        yield record
+
+
+def _drop_trailing_empty_fields(record):
+
+    """
+    Returns List.
+
+    Copy the record without its trailing empty fields.
+
+    Parameters
+    ----------
+    record : List
+    """
+
+    end = len(record)
+    while end and record[end - 1] == '':
+        end -= 1
+
+    return record[:end]
+
+
+def _stage(timings, name):
+
+    """
+    Returns Context Manager.
+
+    Time the stage if timings are given, otherwise do nothing.
+
+    Parameters
+    ----------
+    timings : Timings or None
+    name : String
+    """
+
+    if timings is None:
+        return _NULL_STAGE
+    return timings.stage(name)
+
+
+def _peak_memory():
+
+    """
+    Returns Float or None.
+
+    The peak resident memory of this process in MiB, or None where the
+    resource module is not available.
+    """
+
+    if resource is None:
+        return None
+
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    scale = 1024.0 * 1024.0 if sys.platform == 'darwin' else 1024.0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def convert_excel_to_csv(file_path):
+
+    """
+    Returns String.
+
+    Read an XLS or XLSX file and write it formatted as a CSV.
 
-        # If it is an XLS or XLSX file, delete the temporary file. Only
-        # in cases where the header is appended should the processed
-        # file be returned.
+    The destination file path is qualified with "_processed".
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    """
+
+    new_file_path = file_path.split('.')[0] + '_converted.csv'
+
+    with excel.ExcelWorkbook(file_path=file_path) as workbook, \
+            open(new_file_path, 'wb') as file:
+        csv.writer(file).writerows(workbook.iter_rows())
+
+    return new_file_path
+
+
+def _primitive_read_excel(file_path):
+
+    """
+    Returns List.
+
+    Read an XLS or XLSX file.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    """
+
+    with excel.ExcelWorkbook(file_path=file_path) as workbook:
+        data = list(workbook.iter_rows())
+
+    return data
+
+
+def main(file_path='',
+         is_excel=None,
+         raw_delimiter='',
+         has_header=None,
+         header_file_path='',
+         write_file_with_header=True,
+         confidence_threshold=0.5,
+         timings=None,
+         fail_fast=None):
+
+    # Ask for the file path.
+    file_path = file_path or raw_input('Please specify the full path to this data file: ')
+
+    # Ask if it is an XLS / XLSX file.
+    is_excel = (is_excel
+                if is_excel is not None
+                else raw_input('Is this an Excel file?  Y / n: ').lower() == 'y')
+
+    real_delimiter = ',' if is_excel else None
+    quotechar = '"'
+
+    # The file is read once. The preview, skew check, skewed record
+    # report and data table are all fed from the same pass. Excel rows
+    # are validated as they are read rather than being converted to CSV
+    # first.
+    with DataSource(file_path=file_path, is_excel=is_excel) as source:
+        # Display the first couple of lines so the user can identify
+        # the delimiter. They are kept so they are not read again.
+        with _stage(timings, 'head'):
+            head = source.head()
+        print head
+
+        if not is_excel and not raw_delimiter:
+            # Detect the delimiter from a sample of the file. Only ask
+            # for it if the detection is ambiguous.
+            with _stage(timings, 'sniff_dialect'):
+                sniffed_dialect = sniff_dialect(source.sample())
+            if sniffed_dialect.confidence >= confidence_threshold:
+                real_delimiter = sniffed_dialect.delimiter
+                quotechar = sniffed_dialect.quotechar
+                print 'Detected the delimiter: ' + repr(real_delimiter)
+                print 'Detected the quote character: ' + repr(quotechar)
+            else:
+                print 'The delimiter could not be detected.'
+
+        if not is_excel and real_delimiter is None:
+            # Ask for the delimiter.
+            delimiter_mapping = dict(enumerate(DELIMITERS, 1))
+
+            while True:
+                raw_delimiter = raw_delimiter or raw_input(
+                    """According to the printed text, please enter the delimiter used in this file:
+                    Type 1 for comma (,)
+                    Type 2 for tab (   )
+                    Type 3 for pipe character (|)
+                    Type 4 for semicolon (;)
+                    Type 5 for space ( )
+                    Type 6 for hyphen (-)
+                    """
+                )
+                try:
+                    real_delimiter = delimiter_mapping[int(raw_delimiter)]
+                    break
+                except (ValueError, KeyError):
+                    print 'That is not a valid delimiter. Please try again.'
+                    raw_delimiter = ''
+                except KeyboardInterrupt:
+                    break
+
+        # Ask if a header exists.
+        has_header = (has_header
+                      if has_header is not None
+                      else raw_input('Does this file have a header?  Y / n: ').lower() == 'y')
+
+        file_path_returned = None
+        if not has_header:
+            print 'This file does not have a header. Please append one.'
+            header_file_path = header_file_path or raw_input(
+                """Please specify the full path to the headers file. \n"""
+                """(NOTE: The extension of the header must match the extension of the original file \n"""
+                """UNLESS the original file is an Excel file. In this case, headers must be formatted as CSV.): """)
+
+            if write_file_with_header:
+                # The file with the header is written uncompressed.
+                file_path_returned = handle_file_path(
+                    file_path.split('.')[0] + '_converted.csv'
+                    if is_excel or source.compression is not None
+                    else file_path)
+
+        validation_results = validate_source(
+            source=source,
+            delimiter=real_delimiter,
+            quotechar=quotechar,
+            has_header=has_header,
+            header_file_path=header_file_path,
+            file_path_returned=file_path_returned,
+            profile=True,
+            timings=timings,
+            fail_fast=fail_fast)
+
+    with _stage(timings, 'print_results'):
+        try:
+            if validation_results.is_skewed:
+                raise SkewedDataError
+
+            if has_header:
+                print 'This file is not skewed. Please proceed to the next test. '
+            else:
+                message = ("""The data is not skewed, now has a header, and """
+                           """has been returned to you for further testing.""")
+                print message
+            # Display the fields labels along with the corresponding
+            # unique field values.
+            for column_profile in validation_results.column_profiles:
+                print unicode(column_profile).encode('utf-8')
+        # Catch the SkewedDataError and display the skewed line along with
+        # some context.
+        except SkewedDataError:
+            print 'Failure. This file is skewed.'
+            print_skewed_records(validation_results.skewed_records)
+            if validation_results.stopped_line_number is not None:
+                message = 'Stopped reading at line {line_number}.'
+                print message.format(
+                    line_number=validation_results.stopped_line_number)
+
+    if timings is not None:
+        print timings
 
     validation_results.validate()
 
@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import csv
+import glob
+import multiprocessing
+import os
+
+from . import excel
+from . import main
+
+
+# Each worker process opens the workbook once and reuses it for every
+# sheet it is given.
+_workbook = None
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+
+# Yielded by validate_directory() in place of the results of a file that
+# could not be validated. The error is formatted as "Type: message".
+FileError = collections.namedtuple('FileError', ['file_path', 'error'])
+
+
+def validate_workbook(file_path,
+                      sheets=None,
+                      has_header=True,
+                      header_file_path=None,
+                      processes=None):
+
+    """
+    Returns List.
+
+    Validate each sheet of an XLS or XLSX workbook in a process pool.
+    One ValidationResults is returned per sheet, in the order the
+    sheets were given.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    sheets : List, default None
+        Sheet indices or names. If None, every sheet is validated.
+    has_header : Boolean, default True
+    header_file_path : String, default None
+        File name or path to a CSV header. Used when has_header is
+        False.
+    processes : Integer, default None
+        Number of worker processes. If None, the number of CPUs is
+        used. If 1, the sheets are validated in this process.
+    """
+
+    if sheets is None:
+        with excel.ExcelWorkbook(file_path=file_path) as workbook:
+            sheets = workbook.sheet_names()
+
+    if has_header:
+        header_records = None
+    else:
+        header_records = main.header_registry.get(header_file_path,
+                                                  delimiter=',').records
+
+    tasks = [(sheet, header_records) for sheet in sheets]
+
+    if processes == 1:
+        _open_workbook(file_path=file_path)
+        try:
+            return [_validate_sheet(task) for task in tasks]
+        finally:
+            _close_workbook()
+
+    pool = multiprocessing.Pool(processes=processes,
+                                initializer=_open_workbook,
+                                initargs=(file_path,))
+    try:
+        # Spread the sheets one at a time as they vary widely in size.
+        return pool.map(_validate_sheet, tasks, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def validate_directory(path,
+                       delimiter=None,
+                       has_header=True,
+                       header_file_path=None,
+                       processes=None,
+                       chunksize=1,
+                       keep_records=True):
+
+    """
+    Returns Generator.
+
+    Validate every file in a directory, or every file matching a glob
+    pattern, in a process pool. One ValidationResults is yielded per
+    file as soon as it is ready, so the order is not guaranteed; use
+    its file_path to tell them apart. A file that can not be validated,
+    such as one whose delimiter can not be detected, yields a FileError
+    instead and the other files are still validated.
+
+    Files ending in ".xls" or ".xlsx" are read as Excel workbooks.
+
+    Parameters
+    ----------
+    path : String
+        Directory or glob pattern.
+    delimiter : String, default None
+        Character defining the boundary between record values. If None,
+        it is detected separately for each file.
+    has_header : Boolean, default True
+    header_file_path : String, default None
+        File name or path to the header. Used when has_header is False.
+    processes : Integer, default None
+        Number of worker processes. If None, the number of CPUs is
+        used. If 1, the files are validated in this process.
+    chunksize : Integer, default 1
+        Number of files handed to a worker at a time. Larger chunks
+        reduce overhead when there are many small files.
+    keep_records : Boolean, default True
+        If False, the data tables are left unset so only the summary is
+        sent back from the workers, rather than every record.
+    """
+
+    tasks = [(file_path, delimiter, has_header, header_file_path, keep_records)
+             for file_path in find_files(path)]
+
+    if processes == 1:
+        for task in tasks:
+            yield _validate_file(task)
+        return
+
+    pool = multiprocessing.Pool(processes=processes)
+    try:
+        for validation_results in pool.imap_unordered(_validate_file,
+                                                      tasks,
+                                                      chunksize=chunksize):
+            yield validation_results
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def find_files(path):
+
+    """
+    Returns List.
+
+    Sorted file paths within a directory, or matching a glob pattern.
+    Subdirectories are not included.
+
+    Parameters
+    ----------
+    path : String
+        Directory or glob pattern.
+    """
+
+    if os.path.isdir(path):
+        file_paths = [os.path.join(path, name) for name in os.listdir(path)]
+    else:
+        file_paths = glob.glob(path)
+
+    return sorted(file_path
+                  for file_path in file_paths
+                  if os.path.isfile(file_path))
+
+
+def _validate_file(task):
+
+    """
+    Returns ValidationResults or FileError.
+
+    Parameters
+    ----------
+    task : Tuple
+        File path, delimiter, whether the file has a header, the header
+        file path and whether to keep the records.
+    """
+
+    file_path, delimiter, has_header, header_file_path, keep_records = task
+
+    try:
+        return main.validate(file_path=file_path,
+                             delimiter=delimiter,
+                             is_excel=main.is_excel_file(file_path),
+                             has_header=has_header,
+                             header_file_path=header_file_path,
+                             keep_records=keep_records)
+    except Exception as error:
+        return FileError(
+            file_path=file_path,
+            error='{name}: {error}'.format(name=type(error).__name__,
+                                           error=error))
+
+
+def measure_skewness_in_chunks(file_path,
+                               delimiter,
+                               header_width=None,
+                               processes=None,
+                               chunk_size=DEFAULT_CHUNK_SIZE):
+
+    """
+    Returns SkewStatistics.
+
+    Measure the skewness of a single delimited file by splitting it into
+    byte ranges aligned to newlines and measuring each range in a
+    process pool. The result is identical to main.measure_skewness().
+
+    A range boundary may land inside a quoted field that spans lines.
+    Each range is parsed strictly, so a range that ends inside a quoted
+    field, or is otherwise malformed, is detected and the whole file is
+    measured sequentially instead.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    delimiter : String
+        Character defining the boundary between record values.
+    header_width : Integer, default None
+        Number of fields in the header. If None, the first record is
+        treated as the header.
+    processes : Integer, default None
+        Number of worker processes. If None, the number of CPUs is
+        used. If 1, the ranges are measured in this process.
+    chunk_size : Integer, default 64 MiB
+        Approximate number of bytes per range.
+    """
+
+    statistics = main.SkewStatistics(header_width=header_width)
+
+    with open(file_path, 'rb') as file:
+        start = 0
+        if header_width is None:
+            # The header may itself span lines, so it is parsed rather
+            # than read as a single line.
+            lines = main.ByteCounter(iter(file.readline, ''))
+            header = next(csv.reader(lines, delimiter=delimiter), None)
+            if header is None:
+                return statistics
+            statistics.update(header)
+            start = lines.bytes_read
+
+        file.seek(0, os.SEEK_END)
+        end = file.tell()
+        boundaries = _find_boundaries(file=file,
+                                      start=start,
+                                      end=end,
+                                      chunk_size=chunk_size)
+
+    tasks = [(file_path, delimiter, statistics.header_width, start, end)
+             for start, end in zip(boundaries[:-1], boundaries[1:])]
+
+    if processes == 1:
+        chunks = map(_measure_chunk, tasks)
+    else:
+        pool = multiprocessing.Pool(processes=processes)
+        try:
+            chunks = pool.map(_measure_chunk, tasks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+    if None in chunks:
+        return main.measure_skewness(
+            records=main.read_records(file_path=file_path,
+                                      delimiter=delimiter),
+            header_width=header_width)
+
+    # Merge the ranges in order, offsetting their line numbers.
+    for record_count, max_width, first_skewed_line_number in chunks:
+        if (statistics.first_skewed_line_number is None
+                and first_skewed_line_number is not None):
+            statistics.first_skewed_line_number = (statistics.record_count
+                                                   + first_skewed_line_number)
+        statistics.record_count += record_count
+        statistics.max_width = max(statistics.max_width, max_width)
+
+    return statistics
+
+
+def _find_boundaries(file, start, end, chunk_size):
+
+    """
+    Returns List.
+
+    Offsets splitting the byte range into ranges of roughly chunk_size
+    bytes. Each offset other than start and end follows a newline.
+
+    Parameters
+    ----------
+    file : File
+    start : Integer
+    end : Integer
+    chunk_size : Integer
+    """
+
+    boundaries = [start]
+
+    for offset in xrange(start + chunk_size, end, chunk_size):
+        if offset <= boundaries[-1]:
+            continue
+        # Back up one byte in case the offset already follows a newline.
+        file.seek(offset - 1)
+        file.readline()
+        boundary = file.tell()
+        if boundaries[-1] < boundary < end:
+            boundaries.append(boundary)
+
+    boundaries.append(end)
+
+    return boundaries
+
+
+def _measure_chunk(task):
+
+    """
+    Returns Tuple or None.
+
+    The record count, the max width and the 1-based position of the
+    first skewed record within the range. None if the range could not
+    be parsed strictly.
+
+    Parameters
+    ----------
+    task : Tuple
+        File path, delimiter, header width and the byte range.
+    """
+
+    file_path, delimiter, header_width, start, end = task
+    statistics = main.SkewStatistics(header_width=header_width)
+
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        lines = _read_range(file=file, size=end - start)
+        try:
+            for record in csv.reader(lines, delimiter=delimiter, strict=True):
+                statistics.update(record)
+        except csv.Error:
+            return None
+
+    return (statistics.record_count,
+            statistics.max_width,
+            statistics.first_skewed_line_number)
+
+
+def _read_range(file, size):
+
+    """
+    Returns Generator.
+
+    Lines of the file from its current position until size bytes have
+    been read.
+
+    Parameters
+    ----------
+    file : File
+    size : Integer
+    """
+
+    while size > 0:
+        line = file.readline(size)
+        if not line:
+            break
+        size -= len(line)
+        yield line
+
+
+def _open_workbook(file_path):
+    global _workbook
+    _workbook = excel.ExcelWorkbook(file_path=file_path)
+
+
+def _close_workbook():
+    global _workbook
+    _workbook.close()
+    _workbook = None
+
+
+def _validate_sheet(task):
+
+    """
+    Returns ValidationResults.
+
+    Parameters
+    ----------
+    task : Tuple
+        Sheet index or name, and the header records or None if the
+        sheet has a header.
+    """
+
+    sheet, header_records = task
+    records = _workbook.iter_rows(sheet=sheet)
+    if header_records is None:
+        records = main._trim_header(records)
+
+    validation_results = main.validate_records(records=records,
+                                               header_records=header_records)
+    validation_results.sheet_name = (sheet
+                                     if isinstance(sheet, basestring)
+                                     else _workbook.sheet_names()[sheet])
+
+    return validation_results
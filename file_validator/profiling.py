@@ -0,0 +1,439 @@
+# -*- coding: utf-8 -*-
+
+"""
+Profile the columns of a data set: the number of distinct values, the
+missing values, the inferred data type and the most frequent values.
+
+ColumnProfiler profiles records one at a time in bounded memory, and
+profile_columns() profiles a pandas.DataFrame.
+"""
+
+import hashlib
+import itertools
+import math
+import struct
+
+import numpy as np
+
+
+class ColumnProfile(object):
+
+    """
+    Summary of the values in a column.
+
+    Parameters
+    ----------
+    name : String
+    cardinality : Integer
+        Number of distinct values, counting missing values as one.
+    null_count : Integer
+    dtype : String
+        Inferred data type.
+    top_values : List
+        Most frequent values and their counts, most frequent first.
+    is_approximate : Boolean, default False
+        True if the cardinality is an estimate, in which case the top
+        values are not known.
+    """
+
+    # Every value is listed when there are no more than this many.
+    display_limit = 20
+
+    def __init__(self,
+                 name,
+                 cardinality,
+                 null_count,
+                 dtype,
+                 top_values,
+                 is_approximate=False):
+        self.name = name
+        self.cardinality = cardinality
+        self.null_count = null_count
+        self.dtype = dtype
+        self.top_values = top_values
+        self.is_approximate = is_approximate
+
+    def __unicode__(self):
+        lines = [u'%s: %s' % (_to_text(self.name), self.cardinality)]
+        if self.cardinality <= self.display_limit:
+            for value, _ in self.top_values:
+                lines.append(u' - %s' % _to_text(value))
+
+        return u'\n'.join(lines) + u'\n'
+
+    def __str__(self):
+        return unicode(self).encode('utf-8')
+
+    def to_dict(self):
+
+        """
+        Returns Dictionary.
+
+        JSON serializable summary of the profile. Missing values are
+        represented by None.
+        """
+
+        return {
+            'name': self.name,
+            'cardinality': int(self.cardinality),
+            'null_count': int(self.null_count),
+            'dtype': self.dtype,
+            'is_approximate': self.is_approximate,
+            'top_values': [[_to_json_value(value), int(count)]
+                           for value, count in self.top_values]
+        }
+
+
+# A stable hash keeps sketches comparable across processes and runs.
+_md5 = hashlib.md5
+_unpack_hash = struct.Struct('<q').unpack
+
+
+class HyperLogLog(object):
+
+    """
+    Sketch estimating the number of distinct values added to it in a
+    fixed amount of memory.
+
+    Parameters
+    ----------
+    precision : Integer, default 12
+        The sketch uses 2 ** precision bytes. The standard error is
+        about 1.04 / sqrt(2 ** precision), or 1.6% by default.
+    """
+
+    def __init__(self, precision=12):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value):
+
+        """
+        Returns None.
+
+        Parameters
+        ----------
+        value : String or Unicode
+        """
+
+        self.update([value])
+
+    def update(self, values):
+
+        """
+        Returns None.
+
+        Add many values at once. This is much faster than adding them
+        one at a time.
+
+        Parameters
+        ----------
+        values : Iterable
+        """
+
+        # The hash is unpacked as a signed integer, which stays a fast
+        # machine integer; masking recovers its unsigned bits.
+        registers = self.registers
+        width = 64 - self.precision
+        index_mask = len(registers) - 1
+        mask = (1 << width) - 1
+        md5 = _md5
+        unpack_hash = _unpack_hash
+
+        for value in values:
+            if isinstance(value, unicode):
+                value = value.encode('utf-8')
+            hash_ = unpack_hash(md5(value).digest()[:8])[0]
+            index = (hash_ >> width) & index_mask
+            rank = width - (hash_ & mask).bit_length() + 1
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def cardinality(self):
+
+        """
+        Returns Integer.
+        """
+
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(2.0 ** -register
+                                             for register in self.registers)
+
+        # Small cardinalities are better estimated by linear counting.
+        zero_count = self.registers.count(b'\x00')
+        if estimate <= 2.5 * size and zero_count:
+            estimate = size * math.log(float(size) / zero_count)
+
+        return int(round(estimate))
+
+
+class _ColumnSketch(object):
+
+    """
+    Running summary of one column for ColumnProfiler.
+
+    Values are counted exactly until there are more distinct values
+    than can be displayed. The counts are then dropped and the distinct
+    values seen so far seed a HyperLogLog sketch, which is all that is
+    kept from then on.
+    """
+
+    def __init__(self, limit, precision):
+        self.limit = limit
+        self.precision = precision
+        self.counts = dict()
+        self.sketch = None
+        self.null_count = 0
+        self.dtype = 'int64'
+
+    def update(self, values):
+
+        # Values arrive a batch at a time so that the work is done by
+        # set() and tuple.count() rather than a Python loop per value.
+        self.null_count += values.count('')
+        if self.dtype != 'object':
+            self.dtype = _infer_dtype(values=values, dtype=self.dtype)
+
+        distinct_values = set(values)
+        distinct_values.discard('')
+
+        if self.sketch is not None:
+            self.sketch.update(distinct_values)
+            return
+
+        distinct_count = len(distinct_values.union(self.counts))
+        if distinct_count + bool(self.null_count) > self.limit:
+            self.sketch = HyperLogLog(precision=self.precision)
+            self.sketch.update(self.counts)
+            self.sketch.update(distinct_values)
+            self.counts = None
+            return
+
+        for value in distinct_values:
+            self.counts[value] = self.counts.get(value, 0) + values.count(value)
+
+    def to_column_profile(self, name):
+
+        # Missing values count as one distinct value, as in pandas.
+        if self.null_count:
+            dtype = 'float64' if self.dtype == 'int64' else self.dtype
+        else:
+            dtype = self.dtype
+
+        if self.sketch is not None:
+            return ColumnProfile(
+                name=name,
+                cardinality=self.sketch.cardinality() + bool(self.null_count),
+                null_count=self.null_count,
+                dtype=dtype,
+                top_values=list(),
+                is_approximate=True)
+
+        # Ties are broken by value so the order is repeatable.
+        top_values = sorted(self.counts.items(),
+                            key=lambda item: (-item[1], item[0]))
+        if self.null_count:
+            top_values.append((float('nan'), self.null_count))
+            top_values.sort(key=lambda item: -item[1])
+
+        return ColumnProfile(name=name,
+                             cardinality=len(top_values),
+                             null_count=self.null_count,
+                             dtype=dtype,
+                             top_values=top_values[:self.limit])
+
+
+class ColumnProfiler(object):
+
+    """
+    Profile columns one record at a time.
+
+    Memory is bounded by the number of columns rather than the number
+    of records: each column keeps exact counts only while it has no
+    more distinct values than the display limit, and a fixed size
+    HyperLogLog sketch after that. Records are buffered in small
+    batches and summarized a column at a time.
+
+    Parameters
+    ----------
+    header : List, default None
+        If None, the first record consumed is used.
+    limit : Integer, default 20
+        Number of distinct values counted exactly per column.
+    precision : Integer, default 12
+        Precision of the HyperLogLog sketches.
+    """
+
+    batch_size = 1024
+
+    def __init__(self,
+                 header=None,
+                 limit=ColumnProfile.display_limit,
+                 precision=12):
+        self.header = None
+        self.limit = limit
+        self.precision = precision
+        self._sketches = list()
+        self._batch = list()
+        if header is not None:
+            self._set_header(header)
+
+    def update(self, record):
+
+        """
+        Returns None.
+
+        Consume one record. Fields beyond the header are ignored and
+        missing trailing fields are counted as missing values.
+
+        Parameters
+        ----------
+        record : List
+        """
+
+        if self.header is None:
+            self._set_header(record)
+            return
+
+        self._batch.append(record)
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def column_profiles(self):
+
+        """
+        Returns List.
+
+        One ColumnProfile per column of the header.
+        """
+
+        self._flush()
+
+        return [sketch.to_column_profile(name=name)
+                for name, sketch in zip(self.header or list(), self._sketches)]
+
+    def _set_header(self, header):
+        # main imports this module, so it is imported here instead.
+        from . import main
+
+        self.header = main._drop_trailing_empty_fields(header)
+        self._sketches = [_ColumnSketch(limit=self.limit,
+                                        precision=self.precision)
+                          for _ in self.header]
+
+    def _flush(self):
+        if not self._batch:
+            return
+
+        columns = list(itertools.izip_longest(*self._batch, fillvalue=''))
+        missing_column = ('',) * len(self._batch)
+        for index, sketch in enumerate(self._sketches):
+            sketch.update(columns[index]
+                          if index < len(columns)
+                          else missing_column)
+
+        self._batch = list()
+
+
+def profile_columns(data_frame, top=ColumnProfile.display_limit):
+
+    """
+    Returns List.
+
+    Profile each column of the data frame. The values of each column
+    are hashed once, by value_counts(); everything else is derived
+    from those counts or computed with vectorized operations.
+
+    Parameters
+    ----------
+    data_frame : pandas.DataFrame
+    top : Integer, default 20
+        Number of most frequent values to keep per column.
+    """
+
+    column_profiles = list()
+
+    for column in data_frame:
+        series = data_frame[column]
+        counts = series.value_counts(dropna=False)
+        column_profiles.append(ColumnProfile(
+            name=column,
+            cardinality=len(counts),
+            null_count=int(series.isnull().sum()),
+            dtype=str(series.dtype),
+            top_values=list(counts.head(top).iteritems())))
+
+    return column_profiles
+
+
+def _infer_dtype(values, dtype):
+
+    """
+    Returns String.
+
+    Narrowest of "int64", "float64" and "object" that can hold both the
+    values and every value inferred so far. Missing values are ignored.
+
+    Parameters
+    ----------
+    values : Tuple
+    dtype : String
+        Data type inferred so far.
+    """
+
+    # Checking every value at once covers the common case of
+    # non-negative integers.
+    joined_values = ''.join(values)
+    if dtype == 'int64' and (not joined_values or joined_values.isdigit()):
+        return dtype
+
+    for value in values:
+        if dtype == 'object':
+            break
+        if value == '':
+            continue
+        if dtype == 'int64':
+            try:
+                int(value)
+                continue
+            except ValueError:
+                pass
+        try:
+            float(value)
+            dtype = 'float64'
+        except ValueError:
+            dtype = 'object'
+
+    return dtype
+
+
+def _to_json_value(value):
+
+    """
+    Returns Object.
+
+    Convert NumPy scalars to Python ones and NaN to None.
+    """
+
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+
+    return value
+
+
+def _to_text(value):
+
+    """
+    Returns Unicode.
+
+    Delimited files are read as bytes and are decoded as UTF-8; Excel
+    values are already unicode.
+    """
+
+    if isinstance(value, str):
+        return value.decode('utf-8', 'replace')
+
+    return unicode(value)
@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+
+"""
+Validate uploaded files over HTTP, many at a time in one process.
+
+Each request is handled in its own thread, which only streams the
+upload to a temporary file. The parsing runs in a bounded process pool.
+Once as many validations are pending as the service allows, further
+requests are refused with 503 rather than queued without limit.
+
+Examples
+--------
+    python -m file_validator.service --port 8080 --processes 4
+    curl --data-binary @students.csv 'localhost:8080/validate?name=students.csv'
+    curl --data-binary @body.txt 'localhost:8080/validate?delimiter=tab&header=name%09age'
+"""
+
+import BaseHTTPServer
+import SocketServer
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import urlparse
+
+from . import cli
+from . import main as validator
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ServiceBusyError(Exception):
+    pass
+
+
+class ValidationService(object):
+
+    """
+    Validate files in a process pool on behalf of any number of
+    threads.
+
+    Parameters
+    ----------
+    processes : Integer, default None
+        Number of worker processes. If None, the number of CPUs is
+        used.
+    max_pending : Integer, default None
+        Number of validations, including uploads still being received,
+        allowed at once. If None, four per worker process.
+    timeout : Float, default None
+        Seconds to wait for a worker before giving up. If None, wait
+        indefinitely.
+    """
+
+    def __init__(self, processes=None, max_pending=None, timeout=None):
+        processes = processes or multiprocessing.cpu_count()
+        self.max_pending = max_pending or 4 * processes
+        self.timeout = timeout
+        self.pending = 0
+        self._pool = multiprocessing.Pool(processes=processes)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+
+    def validate(self, path_or_stream, name=None, block=True, **options):
+
+        """
+        Returns Dictionary.
+
+        The summary of validating the file.
+
+        Parameters
+        ----------
+        path_or_stream : String or File
+            File name or path, or a file-like object that is read in
+            chunks into a temporary file first.
+        name : String, default None
+            Name reported in the summary in place of the temporary
+            file's path. Its extension also decides whether the file is
+            read as an Excel workbook, unless is_excel is given.
+        block : Boolean, default True
+            If False and the service is busy, raise ServiceBusyError
+            instead of waiting.
+        **options
+            Passed to main.validate().
+
+        Raises
+        ------
+        ServiceBusyError
+            If block is False and max_pending validations are pending.
+        """
+
+        if not self._slots.acquire(block):
+            raise ServiceBusyError('{0} validations are pending.'.format(
+                self.max_pending))
+        with self._lock:
+            self.pending += 1
+
+        try:
+            if isinstance(path_or_stream, basestring):
+                file_path = path_or_stream
+                temporary_path = None
+            else:
+                suffix = os.path.splitext(name)[1] if name else ''
+                file_path = temporary_path = spool(path_or_stream,
+                                                   suffix=suffix)
+            options.setdefault('is_excel',
+                               validator.is_excel_file(name or file_path))
+
+            try:
+                result = self._pool.apply_async(_validate,
+                                                (file_path, options))
+                summary = result.get(self.timeout)
+            finally:
+                if temporary_path is not None:
+                    os.remove(temporary_path)
+        finally:
+            with self._lock:
+                self.pending -= 1
+            self._slots.release()
+
+        if name:
+            summary['file_path'] = name
+
+        return summary
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ValidationServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+
+    """
+    HTTP front end to a ValidationService.
+
+    POST /validate takes the file as the request body and returns its
+    summary as JSON. The query string may give name, delimiter, excel
+    ("auto", "yes" or "no"), header (the header line, for files without
+    one), profile and confidence_threshold. GET /health returns the
+    number of pending validations.
+
+    Parameters
+    ----------
+    address : Tuple
+        Host and port. Port 0 picks a free port.
+    service : ValidationService
+    verbose : Boolean, default False
+        If True, each request is logged to standard error.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, service, verbose=False):
+        BaseHTTPServer.HTTPServer.__init__(self, address, _RequestHandler)
+        self.service = service
+        self.verbose = verbose
+
+
+class _RequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if urlparse.urlsplit(self.path).path != '/health':
+            self._send(404, {'error': 'Not found.'})
+            return
+
+        service = self.server.service
+        self._send(200, {'pending': service.pending,
+                         'max_pending': service.max_pending})
+
+    def do_POST(self):
+        url = urlparse.urlsplit(self.path)
+        if url.path != '/validate':
+            self._send(404, {'error': 'Not found.'})
+            return
+        if self.headers.getheader('Content-Length') is None:
+            self._send(411, {'error': 'Content-Length is required.'})
+            return
+
+        query = dict(urlparse.parse_qsl(url.query))
+        try:
+            options = _parse_options(query)
+        except ValueError as error:
+            self._send(400, {'error': str(error)})
+            return
+
+        header_file_path = None
+        if 'header' in query:
+            file_descriptor, header_file_path = tempfile.mkstemp()
+            with os.fdopen(file_descriptor, 'wb') as file:
+                file.write(query['header'] + '\n')
+            options['has_header'] = False
+            options['header_file_path'] = header_file_path
+
+        body = _LimitedReader(file=self.rfile,
+                              length=int(self.headers['Content-Length']))
+        try:
+            summary = self.server.service.validate(body,
+                                                   name=query.get('name'),
+                                                   block=False,
+                                                   **options)
+        except ServiceBusyError as error:
+            self._send(503, {'error': str(error)}, {'Retry-After': '1'})
+            return
+        except Exception as error:
+            self._send(422, {
+                'error': '{name}: {error}'.format(name=type(error).__name__,
+                                                  error=error)
+            })
+            return
+        finally:
+            if header_file_path is not None:
+                os.remove(header_file_path)
+
+        self._send(200, summary)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPServer.BaseHTTPRequestHandler.log_message(self,
+                                                              format,
+                                                              *args)
+
+    def _send(self, status, document, headers=None):
+        body = json.dumps(document, sort_keys=True) + '\n'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or dict()).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _LimitedReader(object):
+
+    # Reads no further than the request body, as the connection may
+    # carry more.
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return ''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+
+def spool(stream, suffix='', chunk_size=CHUNK_SIZE):
+
+    """
+    Returns String.
+
+    Copy the stream to a temporary file in chunks and return its path.
+    The caller removes the file.
+
+    Parameters
+    ----------
+    stream : File
+    suffix : String, default ""
+    chunk_size : Integer, default 64 KiB
+    """
+
+    file_descriptor, file_path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(file_descriptor, 'wb') as file:
+            shutil.copyfileobj(stream, file, chunk_size)
+    except Exception:
+        os.remove(file_path)
+        raise
+
+    return file_path
+
+
+def _parse_options(query):
+
+    """
+    Returns Dictionary.
+
+    Options for main.validate() from the query string of a request.
+
+    Parameters
+    ----------
+    query : Dictionary
+
+    Raises
+    ------
+    ValueError
+        If an option is not valid.
+    """
+
+    options = dict()
+
+    if query.get('delimiter'):
+        delimiter = cli.DELIMITER_NAMES.get(query['delimiter'].lower(),
+                                            query['delimiter'])
+        if len(delimiter) != 1:
+            raise ValueError('The delimiter must be a single character.')
+        options['delimiter'] = delimiter
+
+    excel = query.get('excel', 'auto')
+    if excel not in ('auto', 'yes', 'no'):
+        raise ValueError('excel must be "auto", "yes" or "no".')
+    if excel != 'auto':
+        options['is_excel'] = excel == 'yes'
+
+    options['profile'] = query.get('profile', '').lower() in ('1',
+                                                              'true',
+                                                              'yes')
+
+    if 'confidence_threshold' in query:
+        options['confidence_threshold'] = float(
+            query['confidence_threshold'])
+
+    return options
+
+
+def _validate(file_path, options):
+    # Only the summary is sent back, so the records need not be kept.
+    # Its record counts are taken while validating.
+    return validator.validate(file_path=file_path,
+                              keep_records=False,
+                              **options).to_dict()
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m file_validator.service',
+        description='Validate files uploaded over HTTP.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument(
+        '-p', '--processes',
+        type=int,
+        help='number of worker processes (default: the number of CPUs)')
+    parser.add_argument(
+        '--max-pending',
+        type=int,
+        help=('validations allowed at once before requests are refused '
+              '(default: four per worker process)'))
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        metavar='SECONDS',
+        help='maximum time a validation may take')
+    parser.add_argument('-v', '--verbose',
+                        action='store_true',
+                        help='log each request')
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    arguments = parse_arguments(argv)
+    with ValidationService(processes=arguments.processes,
+                           max_pending=arguments.max_pending,
+                           timeout=arguments.timeout) as service:
+        server = ValidationServer((arguments.host, arguments.port),
+                                  service=service,
+                                  verbose=arguments.verbose)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,428 @@
+# -*- coding: utf-8 -*-
+
+"""
+Data tables that hold many records in little memory.
+
+CompactDataTable packs the records into a few contiguous buffers.
+LazyDataTable keeps only an index of byte offsets and reads records
+back from the file on access.
+"""
+
+import StringIO
+import array
+import collections
+import csv
+import itertools
+import mmap
+import os
+
+import numpy as np
+
+
+class _RecordSequence(collections.Sequence):
+
+    """
+    Base class for data tables that rebuild records on access rather
+    than holding them as lists.
+
+    Subclasses implement __len__() and _read(index). Slices are
+    returned as lists of records.
+    """
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in xrange(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('data table index out of range')
+
+        return self._read(index)
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, _RecordSequence)):
+            return NotImplemented
+        return len(self) == len(other) and all(itertools.imap(
+            lambda left, right: left == right, self, other))
+
+    def __ne__(self, other):
+        is_equal = self.__eq__(other)
+        return is_equal if is_equal is NotImplemented else not is_equal
+
+    def __repr__(self):
+        return '{name}({records!r})'.format(name=type(self).__name__,
+                                            records=list(self))
+
+    def to_data_frame(self):
+
+        """
+        Returns pandas.DataFrame.
+
+        See DataTable.to_data_frame().
+        """
+
+        # main imports this module, so it is imported where it is used.
+        from . import main
+
+        return main.DataTable(self).to_data_frame()
+
+
+class CompactDataTable(_RecordSequence):
+
+    """
+    Sequence of records stored in a few contiguous buffers rather than
+    as one Python list and string per record and value.
+
+    The values of every record are concatenated into a single
+    bytearray, with the length of each value and the boundaries of each
+    record kept in arrays. A record is rebuilt as a list when it is
+    accessed. This takes several times less memory than a DataTable, at
+    the cost of rebuilding records on every access.
+
+    Records are compared, sliced and iterated as lists of their values.
+    Values must be strings, and the values of a record are either all
+    byte strings or all unicode.
+
+    Parameters
+    ----------
+    records : Iterable, default None
+    """
+
+    def __init__(self, records=None):
+        self._storage = _CompactStorage()
+        self._start = 0
+        if records is not None:
+            self.extend(records)
+
+    def __len__(self):
+        return len(self._storage.is_unicode) - self._start
+
+    def __iter__(self):
+        read = self._storage.read
+        for index in xrange(self._start, len(self._storage.is_unicode)):
+            yield read(index)
+
+    def _read(self, index):
+        return self._storage.read(self._start + index)
+
+    def append(self, record):
+
+        """
+        Returns None.
+
+        Parameters
+        ----------
+        record : List
+        """
+
+        self._storage.write(record)
+
+    def extend(self, records):
+
+        """
+        Returns None.
+
+        Parameters
+        ----------
+        records : Iterable
+        """
+
+        write = self._storage.write
+        for record in records:
+            write(record)
+
+    def tail(self, start):
+
+        """
+        Returns CompactDataTable.
+
+        The records from the start index onwards. The records are not
+        copied; records appended to this table appear in both.
+
+        Parameters
+        ----------
+        start : Integer
+        """
+
+        data_table = CompactDataTable()
+        data_table._storage = self._storage
+        data_table._start = self._start + start
+
+        return data_table
+
+
+class _CompactStorage(object):
+
+    """
+    Buffers backing one or more CompactDataTable.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.lengths = array.array('I')
+        # The offsets of each record's first byte and first value, with
+        # a final entry marking the end of the last record.
+        self.byte_offsets = array.array('L', [0])
+        self.value_offsets = array.array('L', [0])
+        self.is_unicode = bytearray()
+
+    def write(self, record):
+        joined = ''.join(record)
+        if isinstance(joined, unicode):
+            record = [value.encode('utf-8') for value in record]
+            joined = ''.join(record)
+            self.is_unicode.append(1)
+        else:
+            self.is_unicode.append(0)
+
+        self.buffer += joined
+        self.lengths.extend(itertools.imap(len, record))
+        self.byte_offsets.append(len(self.buffer))
+        self.value_offsets.append(len(self.lengths))
+
+    def read(self, index):
+        start = self.byte_offsets[index]
+        joined = str(self.buffer[start:self.byte_offsets[index + 1]])
+
+        record = list()
+        start = 0
+        for length in self.lengths[self.value_offsets[index]:
+                                   self.value_offsets[index + 1]]:
+            record.append(joined[start:start + length])
+            start += length
+
+        if self.is_unicode[index]:
+            record = [value.decode('utf-8') for value in record]
+
+        return record
+
+
+class LazyDataTable(_RecordSequence):
+
+    """
+    Sequence of the records of a delimited file, read from the file
+    only when they are accessed.
+
+    The byte offset of every record is indexed the first time the table
+    is sized or indexed into, and a record is then parsed by seeking to
+    its offset. Iterating streams the file and needs no index. Only the
+    index, eight bytes per record, is kept in memory.
+
+    The file must not change while the table is in use, and must not
+    be compressed.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    delimiter : String
+        Character defining the boundary between record values.
+    header_records : List, default None
+        Records held in memory and placed before those of the file.
+    index_path : String, default None
+        If given, the index is saved to this file and reused for as
+        long as the size and modification time of the file are
+        unchanged.
+    quotechar : String, default '"'
+        Character quoting values that hold special characters.
+    """
+
+    def __init__(self,
+                 file_path,
+                 delimiter,
+                 header_records=None,
+                 index_path=None,
+                 quotechar='"'):
+        self.file_path = file_path
+        self.delimiter = delimiter
+        self.quotechar = quotechar
+        self.header_records = list(header_records or list())
+        self.index_path = index_path
+        self._offsets = None
+        self._file = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_file'] = None
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self.header_records) + len(self.offsets) - 1
+
+    def __iter__(self):
+        from . import main
+
+        for record in self.header_records:
+            yield record
+        for record in main.read_records(file_path=self.file_path,
+                                        delimiter=self.delimiter,
+                                        quotechar=self.quotechar):
+            yield record
+
+    @property
+    def offsets(self):
+
+        """
+        Returns array.array.
+
+        The byte offset of each record of the file, followed by the
+        offset just past the last record.
+        """
+
+        if self._offsets is None:
+            if self.index_path:
+                self._offsets = _load_record_offsets(
+                    file_path=self.file_path,
+                    index_path=self.index_path)
+            if self._offsets is None:
+                self._offsets = build_record_offsets(
+                    file_path=self.file_path,
+                    delimiter=self.delimiter,
+                    quotechar=self.quotechar)
+                if self.index_path:
+                    _save_record_offsets(file_path=self.file_path,
+                                         index_path=self.index_path,
+                                         offsets=self._offsets)
+
+        return self._offsets
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _read(self, index):
+        if index < len(self.header_records):
+            return self.header_records[index]
+        index -= len(self.header_records)
+
+        if self._file is None:
+            self._file = open(self.file_path, 'rb')
+        start = self.offsets[index]
+        self._file.seek(start)
+        buffer = self._file.read(self.offsets[index + 1] - start)
+        records = csv.reader(StringIO.StringIO(buffer),
+                             delimiter=self.delimiter,
+                             quotechar=self.quotechar)
+
+        return next(records, list())
+
+
+def build_record_offsets(file_path, delimiter, quotechar='"'):
+
+    """
+    Returns array.array.
+
+    The byte offset of each record of a delimited file, followed by the
+    offset just past the last record.
+
+    Unquoted files are indexed by finding their newlines in bulk with
+    NumPy. Otherwise the file is parsed with the csv module so records
+    with quoted newlines are indexed correctly.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    delimiter : String
+        Character defining the boundary between record values.
+    quotechar : String, default '"'
+        Character quoting values that hold special characters.
+    """
+
+    from . import main
+
+    offsets = array.array('L', [0])
+
+    with open(file_path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return offsets
+
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for start, block in main._iter_blocks(buffer):
+                if main._needs_csv(block, quotechar=quotechar):
+                    break
+                line_ends = np.flatnonzero(block == ord('\n')) + (start + 1)
+                del block
+                offsets.fromstring(line_ends.astype(_OFFSET_DTYPE).tostring())
+            else:
+                if offsets[-1] != size:
+                    offsets.append(size)
+                return offsets
+        finally:
+            buffer.close()
+
+        offsets = array.array('L', [0])
+        file.seek(0)
+        lines = main.ByteCounter(file)
+        for _ in csv.reader(lines, delimiter=delimiter, quotechar=quotechar):
+            offsets.append(lines.bytes_read)
+
+    return offsets
+
+
+_OFFSET_DTYPE = np.dtype('u{0}'.format(array.array('L').itemsize))
+
+
+def _save_record_offsets(file_path, index_path, offsets):
+
+    """
+    Returns None.
+
+    The size and modification time of the file are saved ahead of the
+    offsets so a stale index can be recognized.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    index_path : String
+        File name or path of the index.
+    offsets : array.array
+    """
+
+    status = os.stat(file_path)
+    with open(index_path, 'wb') as file:
+        array.array('L', [status.st_size,
+                          int(status.st_mtime * 1e9)]).tofile(file)
+        offsets.tofile(file)
+
+
+def _load_record_offsets(file_path, index_path):
+
+    """
+    Returns array.array or None.
+
+    None if there is no index or it is stale.
+
+    Parameters
+    ----------
+    file_path : String
+        File name or path.
+    index_path : String
+        File name or path of the index.
+    """
+
+    try:
+        file = open(index_path, 'rb')
+    except IOError:
+        return None
+
+    offsets = array.array('L')
+    with file:
+        offsets.fromstring(file.read())
+
+    status = os.stat(file_path)
+    if offsets[:2].tolist() != [status.st_size, int(status.st_mtime * 1e9)]:
+        return None
+
+    return offsets[2:]
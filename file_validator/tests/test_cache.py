@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+
+from nose.tools import (assert_equal,
+                        assert_false,
+                        assert_is_none,
+                        assert_true)
+
+from .. import cache
+from .test_main import data_directory
+
+
+class TestValidationCache(object):
+
+    def setup(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.directory, 'students-skewed.csv')
+        shutil.copy(data_directory + '/' + 'students-skewed.csv',
+                    self.file_path)
+
+    def teardown(self):
+        shutil.rmtree(self.directory)
+
+    def test_cached_validate(self):
+
+        with cache.ValidationCache(directory=self.directory) as cache_:
+            first = cache.cached_validate(cache_,
+                                          file_path=self.file_path,
+                                          delimiter=',')
+            second = cache.cached_validate(cache_,
+                                           file_path=self.file_path,
+                                           delimiter=',')
+
+        assert_false(first['cached'])
+        assert_true(second['cached'])
+        assert_true(second['is_skewed'])
+        del first['cached'], second['cached']
+        assert_equal(first, second)
+
+    def test_options(self):
+
+        with cache.ValidationCache(directory=self.directory) as cache_:
+            cache_.put(self.file_path, {'foo': 1}, options={'profile': True})
+            assert_is_none(cache_.get(self.file_path))
+            assert_equal(cache_.get(self.file_path, options={'profile': True}),
+                         {'foo': 1})
+
+    def test_modified(self):
+
+        with cache.ValidationCache(directory=self.directory,
+                                   use_content_hash=True) as cache_:
+            cache_.put(self.file_path, {'foo': 1})
+            status = os.stat(self.file_path)
+            with open(self.file_path, 'r+b') as file:
+                file.write('x')
+            # Keep the size and the modification time so only the hash
+            # tells the contents apart.
+            os.utime(self.file_path, (status.st_atime, status.st_mtime))
+            assert_is_none(cache_.get(self.file_path))
+
+            cache_.put(self.file_path, {'foo': 2})
+            with open(self.file_path, 'ab') as file:
+                file.write('x')
+            assert_is_none(cache_.get(self.file_path))
+
+    def test_evict(self):
+
+        with cache.ValidationCache(directory=self.directory,
+                                   max_entries=2) as cache_:
+            for i in range(3):
+                cache_.put(self.file_path, {'foo': i}, options={'i': i})
+                # Touch the first entry so the second is least recent.
+                cache_.get(self.file_path, options={'i': 0})
+            assert_equal(cache_.get(self.file_path, options={'i': 0}),
+                         {'foo': 0})
+            assert_is_none(cache_.get(self.file_path, options={'i': 1}))
+
+        with cache.ValidationCache(directory=self.directory, ttl=-1) as cache_:
+            assert_is_none(cache_.get(self.file_path, options={'i': 0}))
+
+    def test_get_releases_lock(self):
+
+        with cache.ValidationCache(directory=self.directory) as cache_:
+            cache_.put(self.file_path, {'foo': 1})
+            assert_equal(cache_.get(self.file_path), {'foo': 1})
+            # Another process can write straight away after a hit.
+            other = cache.ValidationCache(directory=self.directory)
+            other._connection.execute('PRAGMA busy_timeout=0')
+            try:
+                other.put(self.file_path, {'foo': 2}, options={'i': 1})
+            finally:
+                other.close()
+
+    def test_header_file(self):
+
+        header_file_path = os.path.join(self.directory, 'header.csv')
+        with open(header_file_path, 'wb') as file:
+            file.write('id,first,last,color\n')
+        options = {'header_file_path': header_file_path}
+
+        with cache.ValidationCache(directory=self.directory) as cache_:
+            cache_.put(self.file_path, {'foo': 1}, options=options)
+            assert_equal(cache_.get(self.file_path, options=options),
+                         {'foo': 1})
+            with open(header_file_path, 'ab') as file:
+                file.write('x\n')
+            assert_is_none(cache_.get(self.file_path, options=options))
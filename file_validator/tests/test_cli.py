@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+import StringIO
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+
+from nose.tools import (assert_equal,
+                        assert_false,
+                        assert_true)
+
+from .. import cli
+from .test_main import data_directory
+
+
+def _run(argv, stdin=''):
+
+    """
+    Returns Tuple.
+
+    The exit status and the parsed JSON lines.
+    """
+
+    stdout = StringIO.StringIO()
+    status = cli.main(argv=argv,
+                      stdin=StringIO.StringIO(stdin),
+                      stdout=stdout)
+    summaries = [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    return status, summaries
+
+
+def test_cli():
+
+    status, summaries = _run([data_directory + '/' + 'students.csv'])
+
+    assert_equal(status, 0)
+    assert_false(summaries[0]['is_skewed'])
+    assert_equal(summaries[0]['source_record_count'], 4)
+
+
+def test_cli_stdin():
+
+    stdin = '\n'.join([data_directory + '/' + 'students-skewed.csv',
+                       data_directory + '/' + 'students.xlsx',
+                       data_directory + '/' + 'missing.csv'])
+    status, summaries = _run(['--profile', '-'], stdin=stdin)
+
+    assert_equal(status, 1)
+    assert_true(summaries[0]['is_skewed'])
+    assert_equal(summaries[0]['skewed_records'][0]['line_number'], 2)
+    assert_equal(summaries[1]['column_profiles'][1]['cardinality'], 3)
+    assert_true(summaries[2]['error'].startswith('IOError'))
+
+
+def test_cli_missing_header():
+
+    status, summaries = _run(['--no-header',
+                              '--header-file', data_directory + '/' + 'head.txt',
+                              '--delimiter', 'tab',
+                              data_directory + '/' + 'students-missing-header.txt'])
+
+    assert_equal(status, 0)
+    assert_equal(summaries[0]['processed_record_count'], 4)
+
+
+def test_cli_cache():
+
+    directory = tempfile.mkdtemp()
+    argv = ['--cache-dir', directory, data_directory + '/' + 'students.csv']
+    try:
+        _, first = _run(argv)
+        _, second = _run(argv)
+    finally:
+        shutil.rmtree(directory)
+
+    assert_false(first[0]['cached'])
+    assert_true(second[0]['cached'])
+    assert_equal(second[0]['source_record_count'], 4)
+
+
+def test_cli_timings():
+
+    _, summaries = _run(['--timings', data_directory + '/' + 'students.csv'])
+
+    assert_equal([stage['stage'] for stage in summaries[0]['timings']],
+                 ['sniff_dialect', 'read_records'])
+
+
+def test_cli_archive():
+
+    file_descriptor, file_path = tempfile.mkstemp(suffix='.zip')
+    os.close(file_descriptor)
+    with zipfile.ZipFile(file_path, 'w') as archive:
+        for name in ['students.csv', 'students-skewed.csv']:
+            archive.write(data_directory + '/' + name, name)
+    try:
+        status, summaries = _run([file_path])
+    finally:
+        os.remove(file_path)
+
+    assert_equal(status, 1)
+    assert_equal([summary['member_name'] for summary in summaries],
+                 ['students.csv', 'students-skewed.csv'])
+    assert_equal([summary['is_skewed'] for summary in summaries],
+                 [False, True])
+
+
+def test_cli_fail_fast():
+
+    status, summaries = _run(['--fail-fast', '1',
+                              data_directory + '/' + 'students-skewed.csv'])
+
+    assert_equal(status, 1)
+    assert_true(summaries[0]['is_skewed'])
+    assert_equal(summaries[0]['stopped_line_number'], 3)
+    assert_equal(summaries[0]['source_record_count'], 3)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+from nose.tools import assert_equal, assert_list_equal
+
+from .. import excel
+from .test_main import data_directory
+
+
+def test_excel_workbook():
+
+    file_path = data_directory + '/' + 'students-skewed.xlsx'
+
+    with excel.ExcelWorkbook(file_path=file_path) as workbook:
+        assert_list_equal(workbook.sheet_names(), ['Sheet1'])
+        rows = workbook.iter_rows(sheet='Sheet1')
+        assert_list_equal(next(rows), [u'student_local_id',
+                                       u'first_name',
+                                       u'last_name',
+                                       u'favorite_color'])
+        assert_list_equal(next(rows), [u'1.0',
+                                       u'Foo',
+                                       u'Bar',
+                                       u'black',
+                                       u' white'])
+        # Trailing rows without values are dropped.
+        assert_equal(len(list(rows)), 2)
+
+
+def test_excel_workbook_xls_rows():
+
+    import xlrd
+
+    # xlrd 1.0 also reads XLSX, so the same sheet can be read both ways.
+    file_path = data_directory + '/' + 'students-skewed.xlsx'
+
+    with excel.ExcelWorkbook(file_path=file_path) as workbook:
+        expected_rows = list(workbook.iter_rows())
+    workbook = excel.ExcelWorkbook.__new__(excel.ExcelWorkbook)
+    workbook._archive = None
+    workbook._book = xlrd.open_workbook(file_path, on_demand=True)
+    try:
+        assert_list_equal(list(workbook.iter_rows()), expected_rows)
+    finally:
+        workbook.close()
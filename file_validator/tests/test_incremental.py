@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+
+from nose.tools import (assert_equal,
+                        assert_false,
+                        assert_true)
+
+from .. import incremental, main
+
+
+class TestValidateAppended(object):
+
+    def setup(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.directory, 'feed.csv')
+
+    def teardown(self):
+        shutil.rmtree(self.directory)
+
+    def _write(self, buffer, mode='ab'):
+        with open(self.file_path, mode) as file:
+            file.write(buffer)
+
+    def _validate(self):
+        return incremental.validate_appended(file_path=self.file_path,
+                                             delimiter=',',
+                                             profile=True)
+
+    def test_appended(self):
+
+        self._write('foo,bar\n1,2\n3,')
+        checkpoint = self._validate()
+        assert_true(checkpoint.is_restarted)
+        assert_equal(checkpoint.statistics.record_count, 2)
+        assert_equal(checkpoint.offset, len('foo,bar\n1,2\n'))
+
+        # The partial line is read again once it is complete.
+        self._write('4\n5,6,7\n')
+        checkpoint = self._validate()
+        assert_false(checkpoint.is_restarted)
+        assert_equal(checkpoint.bytes_read, len('3,4\n5,6,7\n'))
+        assert_true(checkpoint.is_skewed)
+        assert_equal(checkpoint.statistics.first_skewed_line_number, 4)
+        assert_equal(checkpoint.column_profiles()[0].cardinality, 3)
+
+        expected_statistics = main.measure_skewness(
+            records=main.read_records(file_path=self.file_path,
+                                      delimiter=','))
+        assert_equal(vars(checkpoint.statistics), vars(expected_statistics))
+
+    def test_open_quote(self):
+
+        self._write('foo,bar\n1,"2\n')
+        checkpoint = self._validate()
+        assert_equal(checkpoint.statistics.record_count, 1)
+
+        self._write('still 2"\n')
+        checkpoint = self._validate()
+        assert_equal(checkpoint.statistics.record_count, 2)
+        assert_false(checkpoint.is_skewed)
+
+    def test_rewritten(self):
+
+        self._write('foo,bar\n1,2\n')
+        self._validate()
+
+        self._write('foo,bar\n1,2,3\n', mode='r+b')
+        checkpoint = self._validate()
+        assert_true(checkpoint.is_restarted)
+        assert_true(checkpoint.is_skewed)
+
+        self._write('foo,bar\n', mode='wb')
+        checkpoint = self._validate()
+        assert_true(checkpoint.is_restarted)
+        assert_false(checkpoint.is_skewed)
+        assert_equal(checkpoint.statistics.record_count, 1)
+
+    def test_unreadable_checkpoint(self):
+
+        self._write('foo,bar\n1,2\n')
+        # Refers to a class that no longer exists.
+        with open(self.file_path + '.checkpoint', 'wb') as file:
+            file.write('cfile_validator.main\n_ColumnSketch\n.')
+        checkpoint = self._validate()
+        assert_true(checkpoint.is_restarted)
+        assert_equal(checkpoint.statistics.record_count, 2)
@@ -1,16 +1,28 @@
 # -*- coding: utf-8 -*-
 
+import bz2
+import cProfile
+import contextlib
 import copy
 import csv
+import gzip
 import os
+import shutil
+import tempfile
 import warnings
+import zipfile
 
-from nose.tools import (assert_false,
+import numpy as np
+import pandas as pd
+from nose.tools import (assert_equal,
+                        assert_false,
+                        assert_is_none,
                         assert_list_equal,
+                        assert_raises,
                         assert_true,
                         raises)
 
-from .. import main
+from .. import main, tables
 
 try:
     data_directory = os.environ['FILE_VALIDATOR_DATA_DIRECTORY']
@@ -141,6 +153,279 @@ def test_data_table_from_delimited_buffer():
     assert_list_equal(output_data_table, expected_data_table)
 
 
+def test_data_table_from_data_frame():
+
+    data_frame = pd.DataFrame(
+        {'int': [1, 2, 3, 4],
+         'float': [0.1, np.nan, 1.0 / 3, 1e20],
+         'float32': np.array([0.1, 2.5, np.nan, -0.0], dtype=np.float32),
+         'bool': [True, False, True, False],
+         'object': ['eggs', None, 'ham,"1"\n2', 1.0 / 3],
+         'date': pd.to_datetime(['2017-01-01', None, '2017-01-03', '2017-01-04'])},
+        columns=['int', 'float', 'float32', 'bool', 'object', 'date'])
+
+    expected_data_table = main.DataTable.from_delimited_buffer(
+        data_frame.to_csv(index=False),
+        delimiter=',')
+    output_data_table = main.DataTable.from_data_frame(data_frame)
+
+    assert_list_equal(output_data_table, expected_data_table)
+    assert_list_equal(
+        list(main.iter_data_frame_records(data_frame, chunk_size=3)),
+        expected_data_table)
+
+
+def test_validate_lazy():
+
+    file_path = data_directory + '/' + 'students.csv'
+
+    validation_results = main.validate(file_path=file_path,
+                                       delimiter=',',
+                                       lazy=True)
+    summary = validation_results.to_dict()
+
+    # The summary is counted while validating, not by reading back.
+    assert_is_none(validation_results.source_data_table._offsets)
+    assert_equal(summary['source_record_count'], 4)
+    assert_true(isinstance(validation_results.source_data_table,
+                           tables.LazyDataTable))
+    assert_equal(validation_results.source_data_table,
+                 main.DataTable.from_delimited(file_path, delimiter=','))
+
+
+def test_measure_skewness():
+
+    records = [['foo', 'bar'], ['eggs', '0'], ['ham', '1', '2'], ['spam']]
+    statistics = main.measure_skewness(records=iter(records))
+
+    assert_true(statistics.is_skewed)
+    assert_equal(statistics.header_width, 2)
+    assert_equal(statistics.max_width, 3)
+    assert_equal(statistics.record_count, 4)
+    assert_equal(statistics.first_skewed_line_number, 3)
+
+
+def test_measure_skewness_header_width():
+
+    records = [['eggs', '0', ''], ['ham', '1']]
+    statistics = main.measure_skewness(records=iter(records), header_width=3)
+
+    assert_false(statistics.is_skewed)
+    assert_is_none(statistics.first_skewed_line_number)
+
+
+def test_measure_file_skewness():
+
+    buffers = ['foo|bar\r\neggs|0\r\n\r\nham|1|2\r\nspam|3',
+               'foo|bar\n\n\neggs|0|\nham\n',
+               'foo|bar\neggs|"0|1"\n']
+    block_size = main._BLOCK_SIZE
+
+    for buffer in buffers:
+        file_descriptor, file_path = tempfile.mkstemp()
+        with os.fdopen(file_descriptor, 'wb') as file:
+            file.write(buffer)
+        compressed_file_path = file_path + '.gz'
+        with gzip.open(compressed_file_path, 'wb') as file:
+            file.write(buffer)
+        try:
+            for header_width in [None, 2]:
+                expected_statistics = main.measure_skewness(
+                    records=main.read_records(file_path=file_path,
+                                              delimiter='|'),
+                    header_width=header_width)
+                for main._BLOCK_SIZE in [block_size, 8]:
+                    for path in [file_path, compressed_file_path]:
+                        output_statistics = main.measure_file_skewness(
+                            file_path=path,
+                            delimiter='|',
+                            header_width=header_width)
+                        assert_equal(vars(output_statistics),
+                                     vars(expected_statistics))
+        finally:
+            main._BLOCK_SIZE = block_size
+            os.remove(file_path)
+            os.remove(compressed_file_path)
+
+
+def test_measure_skewness_stop_on_skew():
+
+    records = [['foo', 'bar'], ['eggs', '0', '1'], ['ham', '1', '2', '3']]
+    statistics = main.measure_skewness(records=iter(records),
+                                       stop_on_skew=True)
+
+    assert_true(statistics.is_skewed)
+    assert_equal(statistics.record_count, 2)
+    assert_equal(statistics.max_width, 3)
+
+
+def test_skewness_reporter():
+
+    records = [['foo', 'bar'],
+               ['eggs', '0', ''],
+               ['ham', '1', '2'],
+               ['spam', '3'],
+               ['ham', '1', '2']]
+    reporter = main.SkewnessReporter()
+    for record in records:
+        reporter.update(record)
+    reporter.close()
+
+    line_numbers = [skewed_record.line_number
+                    for skewed_record in reporter.skewed_records]
+    # A trailing empty field still counts, as it does for the verdict,
+    # but is not shown.
+    assert_list_equal(line_numbers, [2, 3, 5])
+    assert_list_equal(reporter.skewed_records[0].record, ['eggs', '0'])
+    assert_list_equal(reporter.skewed_records[1].table,
+                      [['foo', 'bar'],
+                       ['eggs', '0'],
+                       ['ham', '1', '2'],
+                       ['spam', '3']])
+    assert_list_equal(reporter.skewed_records[2].after, [])
+
+
+def test_validate_fail_fast_trailing_delimiter():
+
+    file_descriptor, file_path = tempfile.mkstemp()
+    with os.fdopen(file_descriptor, 'wb') as file:
+        file.write('a,b,c\n')
+        file.writelines('{0},2,3\n'.format(index) for index in xrange(1000))
+        file.write('1,2,3,\n')
+        file.writelines('{0},2,3\n'.format(index) for index in xrange(1000))
+    try:
+        validation_results = main.validate(file_path=file_path,
+                                           delimiter=',',
+                                           fail_fast=1)
+    finally:
+        os.remove(file_path)
+
+    assert_true(validation_results.is_skewed)
+    assert_equal([skewed_record.line_number
+                  for skewed_record in validation_results.skewed_records],
+                 [1002])
+    # The record after it is read for context.
+    assert_equal(validation_results.stopped_line_number, 1003)
+
+
+def test_skewness_reporter_limit():
+
+    records = [['foo'], ['eggs', '0'], ['ham', '1'], ['spam', '2']]
+    reporter = main.SkewnessReporter(limit=1)
+    for record in records:
+        reporter.update(record)
+        if reporter.is_done:
+            break
+    reporter.close()
+
+    assert_equal(reporter.line_count, 3)
+    assert_equal(len(reporter.skewed_records), 1)
+
+
+def test_drop_trailing_empty_fields():
+
+    assert_list_equal(main._drop_trailing_empty_fields(['foo', '', 'bar', '']),
+                      ['foo', '', 'bar'])
+    # Excel rows are unicode.
+    assert_list_equal(main._drop_trailing_empty_fields([u'foo', u'', u'']),
+                      [u'foo'])
+    assert_list_equal(main._drop_trailing_empty_fields(['', '']), [])
+
+
+def test_validate_records():
+
+    lines = main.ByteCounter(['foo,bar\n', 'eggs,0\n', 'ham,1,2\n'])
+    validation_results = main.validate_records(csv.reader(lines))
+
+    assert_true(validation_results.is_skewed)
+    assert_equal(validation_results.bytes_read, None)
+    assert_equal(lines.bytes_read, 23)
+    assert_equal(len(validation_results.source_data_table), 3)
+    assert_equal(validation_results.skewed_records[0].line_number, 3)
+
+
+def test_sniff_dialect():
+
+    sample = 'foo|bar|baz\neggs|0|"1|2"\nham, spam|1|2\n'
+    sniffed_dialect = main.sniff_dialect(sample)
+
+    assert_equal(sniffed_dialect.delimiter, '|')
+    assert_equal(sniffed_dialect.quotechar, '"')
+    assert_equal(sniffed_dialect.confidence, 1.0)
+
+
+def test_sniff_dialect_values_with_hyphens_and_spaces():
+
+    # Dates and values with spaces split the body as consistently as
+    # the delimiter, but not the header.
+    sample = ''.join('{0},user {0},2016-01-{0:02d}\n'.format(index)
+                     for index in xrange(1, 20))
+    sample = 'id,name,signup_date\n' + sample
+    sniffed_dialect = main.sniff_dialect(sample)
+
+    assert_equal(sniffed_dialect.delimiter, ',')
+    assert_equal(sniffed_dialect.confidence, 1.0)
+
+    file_descriptor, file_path = tempfile.mkstemp()
+    with os.fdopen(file_descriptor, 'wb') as file:
+        file.write(sample)
+    try:
+        validation_results = main.validate(file_path=file_path)
+    finally:
+        os.remove(file_path)
+    assert_equal(validation_results.header_width, 3)
+
+
+def test_validate_detected_quotechar():
+
+    file_descriptor, file_path = tempfile.mkstemp()
+    with os.fdopen(file_descriptor, 'wb') as file:
+        file.write("id,note\n1,'a, b'\n2,'c, d'\n3,'e, f'\n")
+    try:
+        validation_results = main.validate(file_path=file_path, lazy=True)
+        assert_equal(validation_results.quotechar, "'")
+        assert_false(validation_results.is_skewed)
+        assert_equal(list(validation_results.source_data_table)[1],
+                     ['1', 'a, b'])
+    finally:
+        os.remove(file_path)
+
+
+def test_sniff_dialect_mostly_skewed():
+
+    sniffed_dialect = main.sniff_dialect('a,b,c\n1,2,3,x\n4,5,6,y\n')
+    assert_equal(sniffed_dialect.delimiter, ',')
+    assert_equal(sniffed_dialect.confidence, 1.0)
+
+    file_descriptor, file_path = tempfile.mkstemp()
+    with open(data_directory + '/' + 'students-skewed.csv', 'rb') as file:
+        lines = file.readlines()
+    with os.fdopen(file_descriptor, 'wb') as file:
+        # Most records are skewed.
+        file.writelines(lines + [lines[1]] * 2)
+    try:
+        validation_results = main.validate(file_path=file_path)
+    finally:
+        os.remove(file_path)
+    assert_true(validation_results.is_skewed)
+
+
+def test_sniff_dialect_tie():
+
+    # Spaces split every line as consistently as the pipes.
+    sniffed_dialect = main.sniff_dialect(
+        'first name|last name|age\nBob Smith|Jo Jones|3\n')
+    assert_equal(sniffed_dialect.delimiter, '|')
+    assert_equal(sniffed_dialect.confidence, 1.0)
+
+
+def test_sniff_dialect_ambiguous():
+
+    sniffed_dialect = main.sniff_dialect('foo\nbar,baz\neggs\nham\n')
+    assert_equal(sniffed_dialect.delimiter, ',')
+    assert_equal(sniffed_dialect.confidence, 0.25)
+
+
 @raises(AssertionError)
 def test_validation_result_unset():
 
@@ -164,6 +449,13 @@ def test_csv():
     assert_false(validation_results.is_skewed)
 
 
+def test_csv_bytes_read():
+
+    validation_results = setup_test_csv()
+    file_path = data_directory + '/' + 'students.csv'
+    assert_equal(validation_results.bytes_read, os.path.getsize(file_path))
+
+
 def setup_test_csv():
 
     file_path = data_directory + '/' + 'students.csv'
@@ -179,6 +471,244 @@ def setup_test_csv():
     return validation_results
 
 
+def test_csv_detected_delimiter():
+
+    file_path = data_directory + '/' + 'students.txt'
+
+    validation_results = main.main(file_path=file_path,
+                                   is_excel=False,
+                                   has_header=True)
+
+    assert_false(validation_results.is_skewed)
+    assert_equal(validation_results.header_width, 4)
+    assert_equal(validation_results.bytes_read, os.path.getsize(file_path))
+
+
+def test_validate_detected_delimiter():
+
+    file_path = data_directory + '/' + 'students-skewed.csv'
+    validation_results = main.validate(file_path=file_path)
+    assert_true(validation_results.is_skewed)
+
+
+def test_validate_timings():
+
+    file_path = data_directory + '/' + 'students.csv'
+    profiler = cProfile.Profile()
+    timings = main.Timings(profiler=profiler)
+    validation_results = main.validate(file_path=file_path,
+                                       profile=True,
+                                       timings=timings)
+
+    stages = dict((stage['stage'], stage) for stage in timings.stages)
+    assert_equal(sorted(stages), ['profile_columns',
+                                  'read_records',
+                                  'sniff_dialect'])
+    assert_equal(stages['read_records']['bytes_read'],
+                 os.path.getsize(file_path))
+    assert_true(all(stage['wall_seconds'] >= 0 for stage in timings.stages))
+    assert_equal(validation_results.to_dict()['timings'], timings.stages)
+    assert_true(profiler.getstats())
+
+
+def test_validate_fail_fast():
+
+    buffer = 'foo,bar\neggs,0\nham,1,2\nspam,3\neggs,4,5\nham,6\n'
+    directory = tempfile.mkdtemp()
+    try:
+        file_path = os.path.join(directory, 'body.csv')
+        with open(file_path, 'wb') as file:
+            file.write(buffer)
+
+        validation_results = main.validate(file_path=file_path,
+                                           delimiter=',',
+                                           fail_fast=1)
+        assert_true(validation_results.is_skewed)
+        assert_equal(validation_results.stopped_line_number, 4)
+        assert_equal(validation_results.bytes_read, len('foo,bar\neggs,0\n'
+                                                        'ham,1,2\nspam,3\n'))
+        assert_equal([skewed_record.line_number
+                      for skewed_record in validation_results.skewed_records],
+                     [3])
+        assert_equal(validation_results.skewed_records[0].after,
+                     [['spam', '3']])
+        assert_equal(len(validation_results.source_data_table), 4)
+
+        validation_results = main.validate(file_path=file_path,
+                                           delimiter=',',
+                                           lazy=True,
+                                           fail_fast=1)
+        assert_is_none(validation_results.source_data_table)
+
+        validation_results = main.validate(file_path=file_path,
+                                           delimiter=',',
+                                           fail_fast=3)
+        assert_is_none(validation_results.stopped_line_number)
+        assert_equal(len(validation_results.skewed_records), 2)
+
+        # The file returned is written in full.
+        header_file_path = os.path.join(directory, 'head.csv')
+        with open(header_file_path, 'wb') as file:
+            file.write('x,y\n')
+        file_path_returned = os.path.join(directory, 'returned.csv')
+        validation_results = main.validate(
+            file_path=file_path,
+            delimiter=',',
+            has_header=False,
+            header_file_path=header_file_path,
+            file_path_returned=file_path_returned,
+            fail_fast=1)
+        # The header from the header file is line 1.
+        assert_equal(validation_results.stopped_line_number, 5)
+        with open(file_path_returned, 'rb') as file:
+            assert_equal(file.read(), 'x,y\n' + buffer)
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_header_registry():
+
+    header_registry = main.HeaderRegistry(max_entries=2)
+    file_descriptor, file_path = tempfile.mkstemp()
+    with os.fdopen(file_descriptor, 'wb') as file:
+        file.write('foo|bar\n')
+
+    try:
+        header_schema = header_registry.get(file_path, delimiter='|')
+        assert_equal(header_schema.fields, ['foo', 'bar'])
+        assert_equal(header_schema.width, 2)
+        assert_equal(header_schema.lines, ['foo|bar\n'])
+        assert_true(header_registry.get(file_path, delimiter='|')
+                    is header_schema)
+
+        header_registry.register('students', file_path)
+        assert_true(header_registry.get('students', delimiter='|')
+                    is header_schema)
+
+        # A changed file is parsed again.
+        with open(file_path, 'wb') as file:
+            file.write('foo|bar|baz\n')
+        assert_equal(header_registry.get('students', delimiter='|').width, 3)
+
+        header_registry.get(file_path, delimiter=',')
+        header_registry.get(data_directory + '/' + 'head.csv', delimiter=',')
+        assert_equal(len(header_registry._schemas), 2)
+    finally:
+        os.remove(file_path)
+
+    assert_equal(main.handle_header(data_directory + '/' + 'head.txt',
+                                    delimiter='\t'),
+                 ['student_local_id', 'first_name', 'last_name',
+                  'favorite_color'])
+
+
+def test_validate_compressed():
+
+    file_path = data_directory + '/' + 'students-missing-header.txt'
+    header_file_path = data_directory + '/' + 'head.txt'
+    expected_results = main.validate(file_path=file_path,
+                                     has_header=False,
+                                     header_file_path=header_file_path)
+
+    directory = tempfile.mkdtemp()
+    try:
+        compressed_header_file_path = os.path.join(directory, 'head.gz')
+        with open(header_file_path, 'rb') as file, \
+                gzip.open(compressed_header_file_path, 'wb') as compressed_file:
+            shutil.copyfileobj(file, compressed_file)
+
+        for name, open_ in [('body.gz', gzip.open), ('body.bz2', bz2.BZ2File)]:
+            compressed_file_path = os.path.join(directory, name)
+            with open(file_path, 'rb') as file, \
+                    contextlib.closing(open_(compressed_file_path,
+                                             'wb')) as compressed_file:
+                shutil.copyfileobj(file, compressed_file)
+
+            validation_results = main.validate(
+                file_path=compressed_file_path,
+                has_header=False,
+                header_file_path=compressed_header_file_path,
+                lazy=True)
+
+            assert_equal(validation_results.processed_data_table,
+                         expected_results.processed_data_table)
+            assert_equal(validation_results.bytes_read,
+                         expected_results.bytes_read)
+            assert_true(main.is_not_skewed(
+                file_path=compressed_file_path,
+                delimiter='\t',
+                header_file_path=compressed_header_file_path))
+            assert_equal(main.DataTable.from_delimited(compressed_file_path,
+                                                       delimiter='\t'),
+                         expected_results.source_data_table)
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_validate_without_records():
+
+    file_path = data_directory + '/' + 'students-missing-header.xlsx'
+    header_file_path = data_directory + '/' + 'head.csv'
+    expected_results = main.validate(file_path=file_path,
+                                     is_excel=True,
+                                     has_header=False,
+                                     header_file_path=header_file_path)
+
+    validation_results = main.validate(file_path=file_path,
+                                       is_excel=True,
+                                       has_header=False,
+                                       header_file_path=header_file_path,
+                                       lazy=True,
+                                       keep_records=False)
+
+    assert_is_none(validation_results.source_data_table)
+    assert_is_none(validation_results.processed_data_table)
+    assert_equal(validation_results.source_record_count,
+                 len(expected_results.source_data_table))
+    assert_equal(validation_results.processed_record_count,
+                 len(expected_results.processed_data_table))
+
+
+def test_validate_archive():
+
+    names = ['students.csv', 'students-skewed.csv']
+    file_descriptor, file_path = tempfile.mkstemp(suffix='.zip')
+    os.close(file_descriptor)
+    with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name in names:
+            archive.write(data_directory + '/' + name, name)
+
+    try:
+        results = main.validate_archive(file_path=file_path)
+        with assert_raises(ValueError):
+            main.validate(file_path=file_path)
+    finally:
+        os.remove(file_path)
+
+    assert_equal([validation_results.member_name
+                  for validation_results in results],
+                 names)
+    assert_equal([validation_results.is_skewed
+                  for validation_results in results],
+                 [False, True])
+    assert_equal(results[0].source_data_table,
+                 main.DataTable.from_delimited(data_directory + '/' + names[0],
+                                               delimiter=','))
+
+
+@raises(main.DelimiterError)
+def test_validate_undetected_delimiter():
+
+    file_descriptor, file_path = tempfile.mkstemp()
+    with os.fdopen(file_descriptor, 'wb') as file:
+        file.write('foo\nbar,baz\neggs\nham\n')
+
+    try:
+        main.validate(file_path=file_path)
+    finally:
+        os.remove(file_path)
+
+
 def test_csv_missing_header():
 
     file_path = data_directory + '/' + 'students-missing-header.csv'
@@ -200,6 +730,46 @@ def test_csv_missing_header():
                       expected_data_frame)
 
 
+def test_csv_missing_header_file_with_header():
+
+    file_path = data_directory + '/' + 'students-missing-header.csv'
+    header_file_path = data_directory + '/' + 'head.csv'
+    file_path_returned = main.handle_file_path(file_path)
+
+    main.main(file_path=file_path,
+              is_excel=False,
+              raw_delimiter='1',
+              has_header=False,
+              header_file_path=header_file_path)
+
+    with open(header_file_path, 'rb') as file:
+        expected_buffer = file.read()
+    with open(file_path, 'rb') as file:
+        expected_buffer += file.read()
+    with open(file_path_returned, 'rb') as file:
+        assert_equal(file.read(), expected_buffer)
+
+
+def test_csv_missing_header_without_file():
+
+    file_path = data_directory + '/' + 'students-missing-header-skewed.csv'
+    file_path_returned = main.handle_file_path(file_path)
+    if os.path.exists(file_path_returned):
+        os.remove(file_path_returned)
+
+    validation_results = main.main(
+        file_path=file_path,
+        is_excel=False,
+        raw_delimiter='1',
+        has_header=False,
+        header_file_path=data_directory + '/' + 'head.csv',
+        write_file_with_header=False)
+
+    assert_true(validation_results.is_skewed)
+    assert_false(os.path.exists(file_path_returned))
+    assert_equal(validation_results.skewed_records[0].line_number, 2)
+
+
 def test_csv_skewed():
 
     file_path = data_directory + '/' + 'students-skewed.csv'
@@ -293,6 +863,13 @@ def setup_test_excel():
     return validation_results
 
 
+def test_excel_no_intermediate_file():
+
+    setup_test_excel()
+    file_path = data_directory + '/' + 'students_converted.csv'
+    assert_false(os.path.exists(file_path))
+
+
 def test_excel_missing_header():
 
     file_path = data_directory + '/' + 'students-missing-header.xlsx'
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+
+from nose.tools import (assert_equal,
+                        assert_false,
+                        assert_list_equal,
+                        assert_true)
+
+from .. import main, parallel
+from .test_main import data_directory
+
+
+def test_validate_workbook():
+
+    file_path = data_directory + '/' + 'students-skewed.xlsx'
+
+    results = parallel.validate_workbook(file_path=file_path, processes=2)
+
+    assert_equal(len(results), 1)
+    assert_true(results[0].is_skewed)
+    assert_equal(results[0].sheet_name, 'Sheet1')
+
+
+def test_validate_workbook_missing_header():
+
+    file_path = data_directory + '/' + 'students-missing-header.xlsx'
+    header_file_path = data_directory + '/' + 'head.csv'
+
+    results = parallel.validate_workbook(file_path=file_path,
+                                         sheets=[0],
+                                         has_header=False,
+                                         header_file_path=header_file_path,
+                                         processes=1)
+
+    assert_false(results[0].is_skewed)
+    assert_list_equal(results[0].processed_data_table[0],
+                      ['student_local_id',
+                       'first_name',
+                       'last_name',
+                       'favorite_color'])
+
+
+def test_validate_directory():
+
+    # Other tests write "-with-header" files into the data directory.
+    directory = tempfile.mkdtemp()
+    for name in ['students.csv', 'students-skewed.csv', 'students.xlsx']:
+        shutil.copy(data_directory + '/' + name, directory)
+    # Its delimiter can not be detected.
+    with open(os.path.join(directory, 'unknown.csv'), 'wb') as file:
+        file.write('foo\n')
+
+    try:
+        results = list(parallel.validate_directory(path=directory,
+                                                   processes=2,
+                                                   chunksize=2))
+        summaries = list(parallel.validate_directory(path=directory,
+                                                     processes=1,
+                                                     keep_records=False))
+    finally:
+        shutil.rmtree(directory)
+    is_skewed = dict((os.path.basename(validation_results.file_path),
+                      validation_results.is_skewed)
+                     for validation_results in results
+                     if not isinstance(validation_results, parallel.FileError))
+    errors = [validation_results
+              for validation_results in results
+              if isinstance(validation_results, parallel.FileError)]
+
+    assert_equal(is_skewed, {'students.csv': False,
+                             'students-skewed.csv': True,
+                             'students.xlsx': False})
+    assert_equal(len(errors), 1)
+    assert_true(errors[0].error.startswith('DelimiterError'))
+    assert_true(all(summary.source_data_table is None
+                    for summary in summaries
+                    if not isinstance(summary, parallel.FileError)))
+
+
+def test_find_files():
+
+    file_paths = parallel.find_files(data_directory)
+    assert_true(os.path.join(data_directory, 'students.xlsx') in file_paths)
+    assert_list_equal(file_paths, sorted(file_paths))
+
+
+def test_measure_skewness_in_chunks():
+
+    lines = ['foo,bar\n'] + ['eggs,{0}\n'.format(i) for i in range(50)]
+    lines[30] = 'ham,1,2\n'
+    lines[40] = 'ham,1,2,3\n'
+    _test_measure_skewness_in_chunks_helper(buffer=''.join(lines),
+                                            header_width=None)
+    _test_measure_skewness_in_chunks_helper(buffer=''.join(lines[1:]),
+                                            header_width=2)
+
+
+def test_measure_skewness_in_chunks_quoted_newlines():
+
+    lines = (['"foo\nbar",baz\n']
+             + ['"eggs\n\n\nham",{0}\n'.format(i) for i in range(20)]
+             + ['spam,"1\n2",3\n'])
+    _test_measure_skewness_in_chunks_helper(buffer=''.join(lines),
+                                            header_width=None)
+
+
+def _test_measure_skewness_in_chunks_helper(buffer, header_width):
+
+    """
+    Returns None.
+
+    Assert the chunked statistics equal the sequential statistics.
+
+    Parameters
+    ----------
+    buffer : String
+    header_width : Integer
+    """
+
+    file_descriptor, file_path = tempfile.mkstemp()
+    with os.fdopen(file_descriptor, 'wb') as file:
+        file.write(buffer)
+
+    try:
+        expected_statistics = main.measure_skewness(
+            records=main.read_records(file_path=file_path, delimiter=','),
+            header_width=header_width)
+        for processes in [1, 2]:
+            output_statistics = parallel.measure_skewness_in_chunks(
+                file_path=file_path,
+                delimiter=',',
+                header_width=header_width,
+                processes=processes,
+                chunk_size=16)
+            assert_equal(vars(output_statistics), vars(expected_statistics))
+    finally:
+        os.remove(file_path)
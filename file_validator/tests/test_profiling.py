@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+from nose.tools import (assert_equal,
+                        assert_false,
+                        assert_list_equal,
+                        assert_true)
+
+from .. import main, profiling
+
+
+def test_profile_columns():
+
+    data_table = main.DataTable([['foo', 'bar'],
+                                 ['eggs', '0'],
+                                 ['ham', '1'],
+                                 ['eggs', '']])
+    column_profiles = profiling.profile_columns(data_table.to_data_frame())
+
+    assert_equal(column_profiles[0].cardinality, 2)
+    assert_list_equal(column_profiles[0].top_values, [('eggs', 2), ('ham', 1)])
+    assert_equal(column_profiles[1].cardinality, 3)
+    assert_equal(column_profiles[1].null_count, 1)
+    assert_equal(column_profiles[1].dtype, 'float64')
+    assert_equal(str(column_profiles[0]), 'foo: 2\n - eggs\n - ham\n')
+
+
+def test_hyper_log_log():
+
+    sketch = profiling.HyperLogLog()
+    for index in range(100000):
+        sketch.add(str(index % 50000))
+
+    assert_true(abs(sketch.cardinality() - 50000) < 50000 * 0.05)
+
+
+def test_column_profiler():
+
+    records = ([['foo', 'bar', 'baz']]
+               + [['eggs', str(index), '1.5'] for index in range(100)]
+               + [['ham', '']])
+    profiler = profiling.ColumnProfiler()
+    for record in records:
+        profiler.update(record)
+    column_profiles = profiler.column_profiles()
+
+    assert_list_equal(column_profiles[0].top_values, [('eggs', 100), ('ham', 1)])
+    assert_false(column_profiles[0].is_approximate)
+    assert_equal(column_profiles[0].dtype, 'object')
+    assert_true(column_profiles[1].is_approximate)
+    assert_true(abs(column_profiles[1].cardinality - 101) <= 3)
+    assert_equal(column_profiles[1].null_count, 1)
+    assert_equal(column_profiles[1].dtype, 'float64')
+    assert_equal(column_profiles[2].cardinality, 2)
+    assert_equal(column_profiles[2].null_count, 1)
+
+
+def test_column_profile_non_ascii():
+
+    # Excel values are unicode and delimited values are UTF-8 bytes.
+    for name, value in [(u'name', u'F\xf3o'), ('name', 'F\xc3\xb3o')]:
+        profiler = profiling.ColumnProfiler()
+        for record in [[name], [value]]:
+            profiler.update(record)
+        column_profile = profiler.column_profiles()[0]
+
+        assert_equal(unicode(column_profile), u'name: 1\n - F\xf3o\n')
+        assert_equal(str(column_profile), 'name: 1\n - F\xc3\xb3o\n')
+
+
+def test_column_profiler_matches_profile_columns():
+
+    data_table = main.DataTable([['foo', 'bar'],
+                                 ['eggs', '0'],
+                                 ['ham', '1'],
+                                 ['eggs', '']])
+    profiler = profiling.ColumnProfiler()
+    for record in data_table:
+        profiler.update(record)
+
+    for left, right in zip(profiler.column_profiles(),
+                           profiling.profile_columns(data_table.to_data_frame())):
+        assert_equal(left.cardinality, right.cardinality)
+        assert_equal(left.null_count, right.null_count)
+        assert_equal(left.dtype, right.dtype)
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+import httplib
+import json
+import threading
+
+from nose.tools import (assert_equal,
+                        assert_false,
+                        assert_raises,
+                        assert_true)
+
+from .. import service, tables
+from .test_main import data_directory
+
+
+class _BlockingStream(object):
+
+    # Holds its reader until released, like a slow upload.
+
+    def __init__(self, data):
+        self.data = data
+        self.is_reading = threading.Event()
+        self.is_released = threading.Event()
+
+    def read(self, size=-1):
+        self.is_reading.set()
+        self.is_released.wait()
+        data, self.data = self.data, ''
+        return data
+
+
+def _request(server, method, path, body=None):
+    connection = httplib.HTTPConnection(*server.server_address)
+    try:
+        connection.request(method, path, body=body)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def test_validation_service():
+
+    file_path = data_directory + '/' + 'students-skewed.xlsx'
+
+    with service.ValidationService(processes=1) as validation_service:
+        summary = validation_service.validate(file_path)
+        with open(data_directory + '/' + 'students.csv', 'rb') as file:
+            stream_summary = validation_service.validate(file,
+                                                         name='students.csv')
+
+    assert_true(summary['is_skewed'])
+    assert_false(stream_summary['is_skewed'])
+    assert_equal(stream_summary['file_path'], 'students.csv')
+    assert_equal(stream_summary['source_record_count'], 4)
+
+
+def test_validate_counts_without_reading_back():
+
+    def fail(self):
+        raise AssertionError('The lazy data table was read back.')
+
+    length = tables.LazyDataTable.__len__
+    tables.LazyDataTable.__len__ = fail
+    try:
+        summary = service._validate(data_directory + '/' + 'students.csv',
+                                    {'delimiter': ','})
+    finally:
+        tables.LazyDataTable.__len__ = length
+
+    assert_equal(summary['source_record_count'], 4)
+
+
+def test_validation_service_busy():
+
+    with service.ValidationService(processes=1,
+                                   max_pending=1) as validation_service:
+        stream = _BlockingStream('foo,bar\neggs,0\n')
+        summaries = list()
+        thread = threading.Thread(
+            target=lambda: summaries.append(
+                validation_service.validate(stream, delimiter=',')))
+        thread.start()
+        stream.is_reading.wait()
+        try:
+            assert_equal(validation_service.pending, 1)
+            with assert_raises(service.ServiceBusyError):
+                validation_service.validate(stream, block=False)
+        finally:
+            stream.is_released.set()
+            thread.join()
+
+    assert_equal(summaries[0]['source_record_count'], 2)
+    assert_equal(validation_service.pending, 0)
+
+
+def test_validation_server():
+
+    with open(data_directory + '/' + 'students-missing-header.txt', 'rb') as file:
+        body = file.read()
+
+    with service.ValidationService(processes=1) as validation_service:
+        server = service.ValidationServer(('127.0.0.1', 0),
+                                          service=validation_service)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            status, summary = _request(
+                server,
+                'POST',
+                '/validate?delimiter=tab&header=id%09first%09last%09color',
+                body=body)
+            invalid_status, _ = _request(server,
+                                         'POST',
+                                         '/validate?delimiter=ab',
+                                         body=body)
+            health_status, health = _request(server, 'GET', '/health')
+        finally:
+            server.shutdown()
+            thread.join()
+            server.server_close()
+
+    assert_equal(status, 200)
+    assert_false(summary['is_skewed'])
+    assert_equal(summary['processed_record_count'], 4)
+    assert_equal(invalid_status, 400)
+    assert_equal(health_status, 200)
+    assert_equal(health['pending'], 0)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+
+from nose.tools import assert_equal, assert_raises, assert_true
+
+from .. import main, tables
+
+
+def test_compact_data_table():
+
+    records = [['foo', 'bar'],
+               [],
+               ['', 'eggs', ''],
+               [u'h\xe4m', u'']]
+
+    data_table = tables.CompactDataTable(records[:2])
+    data_table.extend(records[2:])
+
+    assert_equal(len(data_table), 4)
+    assert_equal(data_table, records)
+    assert_equal(list(data_table), records)
+    assert_equal(data_table[-1], [u'h\xe4m', u''])
+    assert_true(isinstance(data_table[-1][0], unicode))
+    assert_equal(data_table[1:3], records[1:3])
+    assert_raises(IndexError, lambda: data_table[4])
+
+    tail = data_table.tail(2)
+    data_table.append(['spam'])
+    assert_equal(tail, records[2:] + [['spam']])
+
+
+def test_lazy_data_table():
+
+    buffers = ['foo,bar\r\neggs,0\r\n\r\nham,1,2\r\nspam',
+               'foo,bar\n"eggs\n0",1\n\nham,"1,2"\n']
+
+    for buffer in buffers:
+        directory = tempfile.mkdtemp()
+        file_path = os.path.join(directory, 'foo.csv')
+        index_path = os.path.join(directory, 'foo.csv.index')
+        with open(file_path, 'wb') as file:
+            file.write(buffer)
+        expected_data_table = main.DataTable.from_delimited_buffer(
+            buffer,
+            delimiter=',')
+
+        try:
+            with tables.LazyDataTable(file_path=file_path,
+                                      delimiter=',',
+                                      index_path=index_path) as data_table:
+                assert_equal(len(data_table), len(expected_data_table))
+                assert_equal(data_table[-1], expected_data_table[-1])
+                assert_equal(data_table[1:3], expected_data_table[1:3])
+                assert_equal(data_table, expected_data_table)
+
+            # The saved index is reused.
+            assert_true(os.path.exists(index_path))
+            data_table = tables.LazyDataTable(file_path=file_path,
+                                              delimiter=',',
+                                              header_records=[['x']],
+                                              index_path=index_path)
+            assert_equal(list(data_table[i] for i in range(len(data_table))),
+                         [['x']] + expected_data_table)
+            data_table.close()
+        finally:
+            shutil.rmtree(directory)